@@ -29,16 +29,24 @@ class Config:
         self.SQLALCHEMY_DATABASE_URI = _get_env("SQLALCHEMY_DATABASE_URI")
         self.SQLALCHEMY_ENGINE_OPTIONS = {
             "pool_size": int(_get_env("SQLALCHEMY_POOL_SIZE")),
+            "max_overflow": int(_get_env("SQLALCHEMY_MAX_OVERFLOW")),
+            "pool_timeout": int(_get_env("SQLALCHEMY_POOL_TIMEOUT")),
             "pool_recycle": int(_get_env("SQLALCHEMY_POOL_RECYCLE")),
+            "pool_pre_ping": _get_bool_env("SQLALCHEMY_POOL_PRE_PING"),
         }
         self.SQLALCHEMY_ECHO = _get_bool_env("SQLALCHEMY_ECHO")
 
+        # Document indexing configuration
+        self.INDEXING_MAX_WORKERS = int(_get_env("INDEXING_MAX_WORKERS"))
+
         # Weaviate configuration
         self.WEAVIATE_HTTP_HOST = _get_env("WEAVIATE_HTTP_HOST")
         self.WEAVIATE_HTTP_PORT = _get_env("WEAVIATE_HTTP_PORT")
         self.WEAVIATE_GRPC_HOST = _get_env("WEAVIATE_GRPC_HOST")
         self.WEAVIATE_GRPC_PORT = _get_env("WEAVIATE_GRPC_PORT")
         self.WEAVIATE_API_KEY = _get_env("WEAVIATE_API_KEY")
+        self.WEAVIATE_BATCH_SIZE = int(_get_env("WEAVIATE_BATCH_SIZE"))
+        self.WEAVIATE_BATCH_CONCURRENT_REQUESTS = int(_get_env("WEAVIATE_BATCH_CONCURRENT_REQUESTS"))
         
         # Redis configuration
         self.REDIS_HOST = _get_env("REDIS_HOST")
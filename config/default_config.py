@@ -11,15 +11,23 @@ DEFAULT_CONFIG = {
     # SQLAlchemy database configuration
     "SQLALCHEMY_DATABASE_URI": "",
     "SQLALCHEMY_POOL_SIZE": 30,
-    "SQLALCHEMY_POOL_RECYCLE": 3600,
+    "SQLALCHEMY_MAX_OVERFLOW": 20,
+    "SQLALCHEMY_POOL_TIMEOUT": 30,
+    "SQLALCHEMY_POOL_RECYCLE": 1800,
+    "SQLALCHEMY_POOL_PRE_PING": "True",
     "SQLALCHEMY_ECHO": "True",
 
+    # Document indexing configuration
+    "INDEXING_MAX_WORKERS": 4,
+
     # Weaviate vector database configuration
     "WEAVIATE_HTTP_HOST": "localhost",
     "WEAVIATE_HTTP_PORT": 8080,
     "WEAVIATE_GRPC_HOST": "localhost",
     "WEAVIATE_GRPC_PORT": 50051,
     "WEAVIATE_API_KEY": "",
+    "WEAVIATE_BATCH_SIZE": 64,
+    "WEAVIATE_BATCH_CONCURRENT_REQUESTS": 2,
 
     # Redis database configuration
     "REDIS_HOST": "localhost",
@@ -14,3 +14,9 @@ LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE = "lock:keyword_table:update:keyword_tab
 
 # Cache lock for updating a segment's enabled status
 LOCK_SEGMENT_UPDATE_ENABLED = "lock:segment:update:enabled_{segment_id}"
+
+# Cached owner (account_id) of a dataset, used for ownership checks that do not need the dataset row
+CACHE_DATASET_ACCOUNT_ID = "cache:dataset:account_id_{dataset_id}"
+
+# Cache expiration time for dataset ownership in seconds
+CACHE_DATASET_ACCOUNT_ID_EXPIRE_TIME = 60
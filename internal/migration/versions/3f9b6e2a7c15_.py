@@ -0,0 +1,46 @@
+"""empty message
+
+Revision ID: 3f9b6e2a7c15
+Revises: d47a2c9e1b30
+Create Date: 2026-10-18 12:21:07.284519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9b6e2a7c15'
+down_revision = 'd47a2c9e1b30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigram indexes let the `name ILIKE '%word%'` searches use an index instead of a sequential scan
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'document_name_trgm_idx',
+            'document',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'dataset_name_trgm_idx',
+            'dataset',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('dataset_name_trgm_idx', table_name='dataset', postgresql_concurrently=True)
+        op.drop_index('document_name_trgm_idx', table_name='document', postgresql_concurrently=True)
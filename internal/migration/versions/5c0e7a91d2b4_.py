@@ -0,0 +1,42 @@
+"""empty message
+
+Revision ID: 5c0e7a91d2b4
+Revises: b2c1a6165d8c
+Create Date: 2026-10-18 10:12:36.418205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c0e7a91d2b4'
+down_revision = 'b2c1a6165d8c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so that large tables are not write-locked during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'dataset_query_dataset_id_created_at_idx',
+            'dataset_query',
+            ['dataset_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'dataset_account_id_created_at_idx',
+            'dataset',
+            ['account_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('dataset_account_id_created_at_idx', table_name='dataset', postgresql_concurrently=True)
+        op.drop_index('dataset_query_dataset_id_created_at_idx', table_name='dataset_query',
+                      postgresql_concurrently=True)
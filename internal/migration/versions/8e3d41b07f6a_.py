@@ -0,0 +1,33 @@
+"""empty message
+
+Revision ID: 8e3d41b07f6a
+Revises: 5c0e7a91d2b4
+Create Date: 2026-10-18 11:05:52.730114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3d41b07f6a'
+down_revision = '5c0e7a91d2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so that large tables are not write-locked during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'document_dataset_id_position_idx',
+            'document',
+            ['dataset_id', 'position'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('document_dataset_id_position_idx', table_name='document', postgresql_concurrently=True)
@@ -0,0 +1,58 @@
+"""empty message
+
+Revision ID: a61c0d5f8e92
+Revises: 3f9b6e2a7c15
+Create Date: 2026-10-18 13:02:44.917356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61c0d5f8e92'
+down_revision = '3f9b6e2a7c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Dataset names are unique per account; let Postgres enforce it instead of a pre-check SELECT.
+    # 1. Rename existing duplicates (keeping the oldest name as-is) so the unique index can be built
+    op.execute("""
+        UPDATE dataset SET name = LEFT(dataset.name, 246) || '-' || LEFT(dataset.id::text, 8)
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY account_id, name ORDER BY created_at, id) AS rn
+            FROM dataset
+        ) AS ranked
+        WHERE dataset.id = ranked.id AND ranked.rn > 1
+    """)
+
+    with op.get_context().autocommit_block():
+        # 2. Build the unique index under a new name; a leftover INVALID index from a failed run is dropped first
+        #    so the migration can be re-run, while the old lookup index keeps serving queries meanwhile
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS dataset_account_id_name_uidx")
+        op.create_index(
+            'dataset_account_id_name_uidx',
+            'dataset',
+            ['account_id', 'name'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+        # 3. Only drop the old non-unique index once the unique one has been built successfully
+        op.drop_index('dataset_account_id_name_idx', table_name='dataset', postgresql_concurrently=True)
+
+
+def downgrade():
+    # Renamed duplicates are not reverted; only the index is switched back to non-unique
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS dataset_account_id_name_idx")
+        op.create_index(
+            'dataset_account_id_name_idx',
+            'dataset',
+            ['account_id', 'name'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('dataset_account_id_name_uidx', table_name='dataset', postgresql_concurrently=True)
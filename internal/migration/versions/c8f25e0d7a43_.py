@@ -0,0 +1,41 @@
+"""empty message
+
+Revision ID: c8f25e0d7a43
+Revises: a61c0d5f8e92
+Create Date: 2026-10-18 14:08:31.552907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f25e0d7a43'
+down_revision = 'a61c0d5f8e92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (document_id, status) serves the per-document status filters and still covers plain document_id lookups
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'segment_document_id_status_idx',
+            'segment',
+            ['document_id', 'status'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('segment_document_id_idx', table_name='segment', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'segment_document_id_idx',
+            'segment',
+            ['document_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('segment_document_id_status_idx', table_name='segment', postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""empty message
+
+Revision ID: d47a2c9e1b30
+Revises: 8e3d41b07f6a
+Create Date: 2026-10-18 11:48:20.561937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd47a2c9e1b30'
+down_revision = '8e3d41b07f6a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so that large tables are not write-locked during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'document_dataset_id_created_at_idx',
+            'document',
+            ['dataset_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Extend the dataset listing index with id so keyset pagination can seek on (created_at, id)
+        op.drop_index('dataset_account_id_created_at_idx', table_name='dataset', postgresql_concurrently=True)
+        op.create_index(
+            'dataset_account_id_created_at_idx',
+            'dataset',
+            ['account_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('dataset_account_id_created_at_idx', table_name='dataset', postgresql_concurrently=True)
+        op.create_index(
+            'dataset_account_id_created_at_idx',
+            'dataset',
+            ['account_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('document_dataset_id_created_at_idx', table_name='document', postgresql_concurrently=True)
@@ -19,6 +19,7 @@ from sqlalchemy import (
     Index,
 )
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 
 from internal.extension.database_extension import db
 from .app import AppDatasetJoin
@@ -30,7 +31,9 @@ class Dataset(db.Model):
     __tablename__ = "dataset"
     __table_args__ = (
         PrimaryKeyConstraint("id", name="pk_dataset_id"),
-        Index("dataset_account_id_name_idx", "account_id", "name"),
+        Index("dataset_account_id_name_uidx", "account_id", "name", unique=True),
+        Index("dataset_account_id_created_at_idx", "account_id", "created_at", "id"),
+        Index("dataset_name_trgm_idx", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
     )
 
     id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
@@ -94,7 +97,10 @@ class Document(db.Model):
         PrimaryKeyConstraint("id", name="pk_document_id"),
         Index("document_account_id_idx", "account_id"),
         Index("document_dataset_id_idx", "dataset_id"),
+        Index("document_dataset_id_position_idx", "dataset_id", "position"),
+        Index("document_dataset_id_created_at_idx", "dataset_id", "created_at", "id"),
         Index("document_batch_idx", "batch"),
+        Index("document_name_trgm_idx", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
     )
 
     id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
@@ -125,12 +131,15 @@ class Document(db.Model):
     )
     created_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP(0)"))
 
-    @property
-    def upload_file(self) -> "UploadFile":
-        """Read-only property: associated uploaded file."""
-        return db.session.query(UploadFile).filter(
-            UploadFile.id == self.upload_file_id,
-        ).one_or_none()
+    # Associated uploaded file (view-only relationship, there is no database-level foreign key).
+    # Loaded lazily; call sites that render it eager-load it with joinedload(Document.upload_file)
+    upload_file = relationship(
+        UploadFile,
+        primaryjoin="foreign(Document.upload_file_id) == UploadFile.id",
+        uselist=False,
+        viewonly=True,
+        lazy="select",
+    )
 
     @property
     def process_rule(self) -> "ProcessRule":
@@ -166,7 +175,7 @@ class Segment(db.Model):
         PrimaryKeyConstraint("id", name="pk_segment_id"),
         Index("segment_account_id_idx", "account_id"),
         Index("segment_dataset_id_idx", "dataset_id"),
-        Index("segment_document_id_idx", "document_id"),
+        Index("segment_document_id_status_idx", "document_id", "status"),
     )
 
     id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
@@ -197,10 +206,13 @@ class Segment(db.Model):
     )
     created_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP(0)"))
 
-    @property
-    def document(self) -> "Document":
-        """Read-only property: parent document of this segment."""
-        return db.session.query(Document).get(self.document_id)
+    # Parent document of this segment (view-only relationship, there is no database-level foreign key)
+    document = relationship(
+        "Document",
+        primaryjoin="foreign(Segment.document_id) == Document.id",
+        uselist=False,
+        viewonly=True,
+    )
 
 
 class KeywordTable(db.Model):
@@ -229,6 +241,7 @@ class DatasetQuery(db.Model):
     __table_args__ = (
         PrimaryKeyConstraint("id", name="pk_dataset_query_id"),
         Index("dataset_query_dataset_id_idx", "dataset_id"),
+        Index("dataset_query_dataset_id_created_at_idx", "dataset_id", "created_at"),
         Index("dataset_created_by_idx", "created_by"),
         Index("dataset_source_app_id_idx", "source_app_id"),
     )
@@ -17,7 +17,7 @@ from wtforms.validators import (
 from internal.entity.dataset_entity import RetrievalStrategy
 from internal.lib.helper import datetime_to_timestamp
 from internal.model import Dataset, DatasetQuery
-from pkg.paginator import PaginatorReq
+from pkg.paginator import CursorPaginatorReq
 
 
 class CreateDatasetReq(FlaskForm):
@@ -81,7 +81,7 @@ class UpdateDatasetReq(FlaskForm):
     ])
 
 
-class GetDatasetsWithPageReq(PaginatorReq):
+class GetDatasetsWithPageReq(CursorPaginatorReq):
     """Get paginated datasets request"""
     search_word = StringField("search_word", default="", validators=[
         Optional(),
@@ -13,7 +13,7 @@ from wtforms.validators import DataRequired, AnyOf, ValidationError, Length, Opt
 from internal.entity.dataset_entity import ProcessType, DEFAULT_PROCESS_RULE
 from internal.lib.helper import datetime_to_timestamp
 from internal.model import Document
-from pkg.paginator import PaginatorReq
+from pkg.paginator import CursorPaginatorReq
 from .schema import ListField, DictField
 
 
@@ -189,7 +189,7 @@ class UpdateDocumentNameReq(FlaskForm):
     ])
 
 
-class GetDocumentsWithPageReq(PaginatorReq):
+class GetDocumentsWithPageReq(CursorPaginatorReq):
     """Get paginated documents request"""
     search_word = StringField("search_word", default="", validators=[
         Optional()
@@ -57,11 +57,11 @@ from internal.schema.app_schema import (
     GetPublishHistoriesWithPageReq,
     GetDebugConversationMessagesWithPageReq,
 )
+from internal.task.conversation_task import save_agent_thoughts
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .app_config_service import AppConfigService
 from .base_service import BaseService
-from .conversation_service import ConversationService
 from .language_model_service import LanguageModelService
 from .retrieval_service import RetrievalService
 
@@ -72,7 +72,6 @@ class AppService(BaseService):
     """Application service logic"""
     db: SQLAlchemy
     redis_client: Redis
-    conversation_service: ConversationService
     retrieval_service: RetrievalService
     app_config_service: AppConfigService
     language_model_service: LanguageModelService
@@ -615,13 +614,13 @@ class AppService(BaseService):
             yield f"event: {agent_thought.event}\ndata:{json.dumps(data)}\n\n"
 
         # 22. Persist the message and the agent reasoning steps to the DB
-        self.conversation_service.save_agent_thoughts(
+        save_agent_thoughts.delay(
             account_id=account.id,
             app_id=app.id,
             app_config=draft_app_config,
             conversation_id=debug_conversation.id,
             message_id=message.id,
-            agent_thoughts=[agent_thought for agent_thought in agent_thoughts.values()],
+            agent_thoughts=[agent_thought.model_dump(mode="json") for agent_thought in agent_thoughts.values()],
         )
 
     def stop_debug_chat(self, app_id: UUID, task_id: UUID, account: Account) -> None:
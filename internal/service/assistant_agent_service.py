@@ -27,10 +27,10 @@ from internal.entity.conversation_entity import InvokeFrom, MessageStatus
 from internal.model import Account, Message
 from internal.schema.assistant_agent_schema import GetAssistantAgentMessagesWithPageReq
 from internal.task.app_task import auto_create_app
+from internal.task.conversation_task import save_agent_thoughts
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
-from .conversation_service import ConversationService
 from .faiss_service import FaissService
 
 
@@ -40,7 +40,6 @@ class AssistantAgentService(BaseService):
     """Assistant agent service"""
     db: SQLAlchemy
     faiss_service: FaissService
-    conversation_service: ConversationService
 
     def chat(self, query, account: Account) -> Generator:
         """Chat with the assistant agent using the given query and account"""
@@ -150,13 +149,13 @@ class AssistantAgentService(BaseService):
             yield f"event: {agent_thought.event}\ndata:{json.dumps(data)}\n\n"
 
         # 15. Persist messages and agent reasoning traces to the database
-        self.conversation_service.save_agent_thoughts(
+        save_agent_thoughts.delay(
             account_id=account.id,
             app_id=assistant_agent_id,
             app_config={"long_term_memory": {"enable": True}},
             conversation_id=conversation.id,
             message_id=message.id,
-            agent_thoughts=list(agent_thoughts.values()),
+            agent_thoughts=[agent_thought.model_dump(mode="json") for agent_thought in agent_thoughts.values()],
         )
 
     @classmethod
@@ -3,6 +3,7 @@
 """
 @File    : s3_service.py
 """
+import functools
 import hashlib
 import os
 import uuid
@@ -21,6 +22,28 @@ from internal.model import Account, UploadFile
 from .upload_file_service import UploadFileService
 
 
+@functools.lru_cache(maxsize=1)
+def _get_url_base() -> str:
+    """Resolve the public URL prefix for S3 objects once; the env configuration is fixed per process."""
+    domain = os.getenv("S3_DOMAIN")
+    bucket = os.getenv("S3_BUCKET")
+    region = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
+
+    if not bucket:
+        raise FailException("S3 bucket not configured (S3_BUCKET).")
+
+    if domain:
+        # e.g., https://cdn.example.com/path/to/object
+        return domain.rstrip("/")
+
+    if not region:
+        # Fallback global endpoint
+        return f"https://{bucket}.s3.amazonaws.com"
+
+    # Virtual-hosted–style URL (recommended)
+    return f"https://{bucket}.s3.{region}.amazonaws.com"
+
+
 @inject
 @dataclass
 class S3Service:
@@ -121,24 +144,7 @@ class S3Service:
         - If S3_DOMAIN is set (e.g., your CloudFront or custom domain), use that.
         - Else build a standard regional S3 URL.
         """
-        domain = os.getenv("S3_DOMAIN")
-        bucket = os.getenv("S3_BUCKET")
-        region = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
-
-        if not bucket:
-            raise FailException("S3 bucket not configured (S3_BUCKET).")
-
-        if domain:
-            # e.g., https://cdn.example.com/path/to/object
-            base = domain.rstrip("/")
-            return f"{base}/{key}"
-
-        if not region:
-            # Fallback global endpoint
-            return f"https://{bucket}.s3.amazonaws.com/{key}"
-
-        # Virtual-hosted–style URL (recommended)
-        return f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
+        return f"{_get_url_base()}/{key}"
 
     @classmethod
     def _get_client(cls):
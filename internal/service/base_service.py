@@ -17,8 +17,7 @@ class BaseService:
     def create(self, model: Any, **kwargs) -> Any:
         """Create a database record based on the given model and keyword arguments"""
         with self.db.auto_commit():
-            model_instance = model(**kwargs)
-            self.db.session.add(model_instance)
+            model_instance = self._create_nocommit(model, **kwargs)
         return model_instance
 
     def delete(self, model_instance: Any) -> Any:
@@ -30,13 +29,24 @@ class BaseService:
     def update(self, model_instance: Any, **kwargs) -> Any:
         """Update a database record based on the given model instance and fields"""
         with self.db.auto_commit():
-            for field, value in kwargs.items():
-                if hasattr(model_instance, field):
-                    setattr(model_instance, field, value)
-                else:
-                    raise FailException("Failed to update: field does not exist")
+            self._update_nocommit(model_instance, **kwargs)
         return model_instance
 
     def get(self, model: Any, primary_key: Any) -> Optional[Any]:
         """Retrieve a single record by primary key using the given model"""
         return self.db.session.query(model).get(primary_key)
+
+    def _create_nocommit(self, model: Any, **kwargs) -> Any:
+        """Add a new record to the session without committing; the caller owns the transaction"""
+        model_instance = model(**kwargs)
+        self.db.session.add(model_instance)
+        return model_instance
+
+    def _update_nocommit(self, model_instance: Any, **kwargs) -> Any:
+        """Set fields on a model instance without committing; the caller owns the transaction"""
+        for field, value in kwargs.items():
+            if hasattr(model_instance, field):
+                setattr(model_instance, field, value)
+            else:
+                raise FailException("Failed to update: field does not exist")
+        return model_instance
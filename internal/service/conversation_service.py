@@ -3,14 +3,14 @@
 """
 @File    : conversation_service.py
 """
+import functools
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from threading import Thread
 from typing import Any
 from uuid import UUID
 
-from flask import Flask, current_app
+import httpx
 from injector import inject
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
@@ -35,6 +35,57 @@ from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
 
+logger = logging.getLogger(__name__)
+
+# Agent events that are stored as MessageAgentThought records
+_PERSISTED_EVENTS = frozenset({
+    QueueEvent.LONG_TERM_MEMORY_RECALL,
+    QueueEvent.AGENT_THOUGHT,
+    QueueEvent.AGENT_MESSAGE,
+    QueueEvent.AGENT_ACTION,
+    QueueEvent.DATASET_RETRIEVAL,
+})
+
+
+def _build_json_schema_format(model: type) -> dict[str, Any]:
+    """Build a strict OpenAI json_schema response_format from a structured output model."""
+    schema = model.schema()
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__,
+            "description": schema.get("description", ""),
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": schema["properties"],
+                "required": list(schema["properties"]),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+# Response formats are built once so the server enforces the schema without a tool-call wrapper
+_CONVERSATION_INFO_FORMAT = _build_json_schema_format(ConversationInfo)
+_SUGGESTED_QUESTIONS_FORMAT = _build_json_schema_format(SuggestedQuestions)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_llm(temperature: float) -> ChatOpenAI:
+    """Return a process-wide gpt-4o-mini instance that reuses the shared HTTP/2 connection pool."""
+    return ChatOpenAI(model="gpt-4o-mini", temperature=temperature, http_client=_get_http_client())
+
+
+@functools.lru_cache(maxsize=1)
+def _get_http_client() -> httpx.Client:
+    """Return the shared HTTP/2 client, built lazily so Celery workers create it after fork."""
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
+
 
 @inject
 @dataclass
@@ -49,7 +100,7 @@ class ConversationService(BaseService):
         prompt = ChatPromptTemplate.from_template(SUMMARIZER_TEMPLATE)
 
         # 2. Initialize the LLM with lower temperature to reduce hallucinations
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.5)
+        llm = _get_llm(0.5)
 
         # 3. Build the chain
         summary_chain = prompt | llm | StrOutputParser()
@@ -72,30 +123,22 @@ class ConversationService(BaseService):
         ])
 
         # 2. Initialize the LLM with zero temperature for deterministic output
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        structured_llm = llm.with_structured_output(ConversationInfo)
+        llm = _get_llm(0).bind(response_format=_CONVERSATION_INFO_FORMAT)
 
         # 3. Build the chain
-        chain = prompt | structured_llm
+        chain = prompt | llm | StrOutputParser()
 
         # 4. Normalize and truncate overly long queries
         if len(query) > 2000:
             query = query[:300] + "...[TRUNCATED]..." + query[-300:]
         query = query.replace("\n", " ")
 
-        # 5. Invoke the chain to generate conversation info
-        conversation_info = chain.invoke({"query": query})
-
-        # 6. Extract conversation name
-        name = "New Conversation"
+        # 5. Invoke the chain and extract the conversation name, falling back to the default on failure
         try:
-            if conversation_info and hasattr(conversation_info, "subject"):
-                name = conversation_info.subject
-        except Exception as e:
-            logging.exception(
-                "Failed to extract conversation name, conversation_info: %(conversation_info)s, error: %(error)s",
-                {"conversation_info": conversation_info, "error": e},
-            )
+            name = ConversationInfo.parse_raw(chain.invoke({"query": query})).subject or "New Conversation"
+        except Exception:
+            logger.warning("Failed to generate conversation name", exc_info=True)
+            name = "New Conversation"
 
         if len(name) > 75:
             name = name[:75] + "..."
@@ -112,28 +155,17 @@ class ConversationService(BaseService):
         ])
 
         # 2. Initialize the LLM with zero temperature
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        structured_llm = llm.with_structured_output(SuggestedQuestions)
+        llm = _get_llm(0).bind(response_format=_SUGGESTED_QUESTIONS_FORMAT)
 
         # 3. Build the chain
-        chain = prompt | structured_llm
+        chain = prompt | llm | StrOutputParser()
 
-        # 4. Invoke the chain to generate suggested questions
-        suggested_questions = chain.invoke({"histories": histories})
-
-        # 5. Extract questions
-        questions = []
+        # 4. Invoke the chain and keep at most three questions, falling back to none on failure
         try:
-            if suggested_questions and hasattr(suggested_questions, "questions"):
-                questions = suggested_questions.questions
-        except Exception as e:
-            logging.exception(
-                "Failed to generate suggested questions, suggested_questions: %(suggested_questions)s, error: %(error)s",
-                {"suggested_questions": suggested_questions, "error": e},
-            )
-
-        if len(questions) > 3:
-            questions = questions[:3]
+            questions = SuggestedQuestions.parse_raw(chain.invoke({"histories": histories})).questions[:3]
+        except Exception:
+            logger.warning("Failed to generate suggested questions", exc_info=True)
+            questions = []
 
         return questions
 
@@ -146,142 +178,118 @@ class ConversationService(BaseService):
             message_id: UUID,
             agent_thoughts: list[AgentThought],
     ):
-        """Persist agent reasoning steps."""
-        # 1. Initialize position index and total latency
+        """Persist agent reasoning steps.
+
+        Runs inside the `save_agent_thoughts` Celery task, so the LLM calls for the
+        summary and conversation name are made inline rather than on extra threads.
+        The task is acknowledged late and may be redelivered after a worker crash,
+        so a message whose reasoning steps are already stored is skipped.
+        """
+        # 1. Skip redelivered tasks whose reasoning steps were already committed
+        already_saved = self.db.session.query(
+            self.db.session.query(MessageAgentThought).filter(
+                MessageAgentThought.message_id == message_id,
+            ).exists()
+        ).scalar()
+        if already_saved:
+            return
+
+        # 2. Initialize position index and total latency
         position = 0
         latency = 0
 
-        # 2. Re-fetch conversation and message to ensure they are managed by the current session
+        # 3. Re-fetch conversation and message to ensure they are managed by the current session
         conversation = self.get(Conversation, conversation_id)
         message = self.get(Message, message_id)
-
-        # 3. Iterate through all agent reasoning steps
-        for agent_thought in agent_thoughts:
-            # 4. Store reasoning steps such as memory recall, thoughts, messages, actions, and retrievals
-            if agent_thought.event in [
-                QueueEvent.LONG_TERM_MEMORY_RECALL,
-                QueueEvent.AGENT_THOUGHT,
-                QueueEvent.AGENT_MESSAGE,
-                QueueEvent.AGENT_ACTION,
-                QueueEvent.DATASET_RETRIEVAL,
-            ]:
-                # 5. Update position and latency
-                position += 1
-                latency += agent_thought.latency
-
-                # 6. Persist agent reasoning step
-                self.create(
-                    MessageAgentThought,
-                    app_id=app_id,
-                    conversation_id=conversation.id,
-                    message_id=message.id,
-                    invoke_from=InvokeFrom.DEBUGGER,
-                    created_by=account_id,
-                    position=position,
-                    event=agent_thought.event,
-                    thought=agent_thought.thought,
-                    observation=agent_thought.observation,
-                    tool=agent_thought.tool,
-                    tool_input=agent_thought.tool_input,
-                    # Message-related fields
-                    message=agent_thought.message,
-                    message_token_count=agent_thought.message_token_count,
-                    message_unit_price=agent_thought.message_unit_price,
-                    message_price_unit=agent_thought.message_price_unit,
-                    # Answer-related fields
-                    answer=agent_thought.answer,
-                    answer_token_count=agent_thought.answer_token_count,
-                    answer_unit_price=agent_thought.answer_unit_price,
-                    answer_price_unit=agent_thought.answer_price_unit,
-                    # Agent statistics
-                    total_token_count=agent_thought.total_token_count,
-                    total_price=agent_thought.total_price,
-                    latency=agent_thought.latency,
-                )
-
-            # 7. If the event is an agent message
-            if agent_thought.event == QueueEvent.AGENT_MESSAGE:
-                # 8. Update message content
-                self.update(
-                    message,
-                    message=agent_thought.message,
-                    message_token_count=agent_thought.message_token_count,
-                    message_unit_price=agent_thought.message_unit_price,
-                    message_price_unit=agent_thought.message_price_unit,
-                    answer=agent_thought.answer,
-                    answer_token_count=agent_thought.answer_token_count,
-                    answer_unit_price=agent_thought.answer_unit_price,
-                    answer_price_unit=agent_thought.answer_price_unit,
-                    total_token_count=agent_thought.total_token_count,
-                    total_price=agent_thought.total_price,
-                    latency=latency,
+        long_term_memory_enabled = (app_config.get("long_term_memory") or {}).get("enable", False)
+
+        # 4. Persist all reasoning steps and the final message state in a single transaction
+        agent_messages = []
+        with self.db.auto_commit():
+            for agent_thought in agent_thoughts:
+                # 5. Store reasoning steps such as memory recall, thoughts, messages, actions, and retrievals
+                if agent_thought.event in _PERSISTED_EVENTS:
+                    # 6. Update position and latency
+                    position += 1
+                    latency += agent_thought.latency
+
+                    # 7. Persist agent reasoning step
+                    self._create_nocommit(
+                        MessageAgentThought,
+                        app_id=app_id,
+                        conversation_id=conversation.id,
+                        message_id=message.id,
+                        invoke_from=InvokeFrom.DEBUGGER,
+                        created_by=account_id,
+                        position=position,
+                        event=agent_thought.event,
+                        thought=agent_thought.thought,
+                        observation=agent_thought.observation,
+                        tool=agent_thought.tool,
+                        tool_input=agent_thought.tool_input,
+                        # Message-related fields
+                        message=agent_thought.message,
+                        message_token_count=agent_thought.message_token_count,
+                        message_unit_price=agent_thought.message_unit_price,
+                        message_price_unit=agent_thought.message_price_unit,
+                        # Answer-related fields
+                        answer=agent_thought.answer,
+                        answer_token_count=agent_thought.answer_token_count,
+                        answer_unit_price=agent_thought.answer_unit_price,
+                        answer_price_unit=agent_thought.answer_price_unit,
+                        # Agent statistics
+                        total_token_count=agent_thought.total_token_count,
+                        total_price=agent_thought.total_price,
+                        latency=agent_thought.latency,
+                    )
+
+                # 8. If the event is an agent message, update message content
+                if agent_thought.event == QueueEvent.AGENT_MESSAGE:
+                    self._update_nocommit(
+                        message,
+                        message=agent_thought.message,
+                        message_token_count=agent_thought.message_token_count,
+                        message_unit_price=agent_thought.message_unit_price,
+                        message_price_unit=agent_thought.message_price_unit,
+                        answer=agent_thought.answer,
+                        answer_token_count=agent_thought.answer_token_count,
+                        answer_unit_price=agent_thought.answer_unit_price,
+                        answer_price_unit=agent_thought.answer_price_unit,
+                        total_token_count=agent_thought.total_token_count,
+                        total_price=agent_thought.total_price,
+                        latency=latency,
+                    )
+                    agent_messages.append(agent_thought)
+
+                # 9. If timeout, stop, or error occurs, update message status
+                if agent_thought.event in [QueueEvent.TIMEOUT, QueueEvent.STOP, QueueEvent.ERROR]:
+                    self._update_nocommit(
+                        message,
+                        status=agent_thought.event,
+                        error=agent_thought.observation,
+                    )
+                    break
+
+        # 10. Run the LLM-backed conversation updates after the commit so no transaction is held open
+        for agent_thought in agent_messages:
+            conversation_updates = {}
+
+            # 11. Generate conversation summary if long-term memory is enabled
+            #     (skipped for empty answers, e.g. when the stream errored mid-answer)
+            if long_term_memory_enabled and agent_thought.answer and agent_thought.answer.strip():
+                conversation_updates["summary"] = self.summary(
+                    message.query,
+                    agent_thought.answer,
+                    conversation.summary,
                 )
 
-                # 9. Generate conversation summary if long-term memory is enabled
-                if app_config["long_term_memory"]["enable"]:
-                    Thread(
-                        target=self._generate_summary_and_update,
-                        kwargs={
-                            "flask_app": current_app._get_current_object(),
-                            "conversation_id": conversation.id,
-                            "query": message.query,
-                            "answer": agent_thought.answer,
-                        },
-                    ).start()
-
-                # 10. Generate conversation name for new conversations
-                if conversation.is_new:
-                    Thread(
-                        target=self._generate_conversation_name_and_update,
-                        kwargs={
-                            "flask_app": current_app._get_current_object(),
-                            "conversation_id": conversation.id,
-                            "query": message.query,
-                        }
-                    ).start()
-
-            # 11. If timeout, stop, or error occurs, update message status
-            if agent_thought.event in [QueueEvent.TIMEOUT, QueueEvent.STOP, QueueEvent.ERROR]:
-                self.update(
-                    message,
-                    status=agent_thought.event,
-                    error=agent_thought.observation,
-                )
-                break
-
-    def _generate_summary_and_update(
-            self,
-            flask_app: Flask,
-            conversation_id: UUID,
-            query: str,
-            answer: str,
-    ):
-        with flask_app.app_context():
-            # 1. Retrieve conversation
-            conversation = self.get(Conversation, conversation_id)
+            # 12. Generate conversation name for new conversations that have a query to name after
+            if message.query and message.query.strip() and conversation.is_new:
+                conversation_updates["name"] = self.generate_conversation_name(message.query)
 
-            # 2. Generate updated summary
-            new_summary = self.summary(query, answer, conversation.summary)
-
-            # 3. Update conversation summary
-            self.update(conversation, summary=new_summary)
-
-    def _generate_conversation_name_and_update(
-            self,
-            flask_app: Flask,
-            conversation_id: UUID,
-            query: str
-    ) -> None:
-        """Generate and update conversation name."""
-        with flask_app.app_context():
-            # 1. Retrieve conversation
-            conversation = self.get(Conversation, conversation_id)
-
-            # 2. Generate new conversation name
-            new_conversation_name = self.generate_conversation_name(query)
-
-            # 3. Update conversation name
-            self.update(conversation, name=new_conversation_name)
+            # 13. Write summary and name back with a single UPDATE
+            if conversation_updates:
+                self.update(conversation, **conversation_updates)
 
     def get_conversation(self, conversation_id: UUID, account: Account) -> Conversation:
         """Retrieve a conversation by ID and account."""
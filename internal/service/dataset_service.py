@@ -7,13 +7,18 @@ import logging
 from dataclasses import dataclass
 from uuid import UUID
 
+from flask import g
 from injector import inject
+from redis import Redis
 from sqlalchemy import desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
 
+from internal.entity.cache_entity import CACHE_DATASET_ACCOUNT_ID, CACHE_DATASET_ACCOUNT_ID_EXPIRE_TIME
 from internal.entity.dataset_entity import DEFAULT_DATASET_DESCRIPTION_FORMATTER
 from internal.exception import ValidateErrorException, NotFoundException, FailException
 from internal.lib.helper import datetime_to_timestamp
-from internal.model import Dataset, Segment, DatasetQuery, AppDatasetJoin, Account
+from internal.model import Dataset, Document, Segment, DatasetQuery, AppDatasetJoin, Account
 from internal.schema.dataset_schema import (
     CreateDatasetReq,
     UpdateDatasetReq,
@@ -32,45 +37,39 @@ from .retrieval_service import RetrievalService
 class DatasetService(BaseService):
     """Knowledge base service"""
     db: SQLAlchemy
+    redis_client: Redis
     retrieval_service: RetrievalService
 
     def create_dataset(self, req: CreateDatasetReq, account: Account) -> Dataset:
         """Create a knowledge base using the provided request data."""
-        # 1. Check whether a dataset with the same name already exists under this account
-        dataset = self.db.session.query(Dataset).filter_by(
-            account_id=account.id,
-            name=req.name.data,
-        ).one_or_none()
-        if dataset:
-            raise ValidateErrorException(f"The dataset '{req.name.data}' already exists.")
-
-        # 2. Populate default description if none is provided
+        # 1. Populate default description if none is provided
         if req.description.data is None or req.description.data.strip() == "":
             req.description.data = DEFAULT_DATASET_DESCRIPTION_FORMATTER.format(
                 name=req.name.data
             )
 
-        # 3. Create and return the dataset record
-        return self.create(
-            Dataset,
-            account_id=account.id,
-            name=req.name.data,
-            icon=req.icon.data,
-            description=req.description.data,
-        )
+        # 2. Create and return the dataset record, relying on the unique (account_id, name) index for name conflicts
+        try:
+            return self.create(
+                Dataset,
+                account_id=account.id,
+                name=req.name.data,
+                icon=req.icon.data,
+                description=req.description.data,
+            )
+        except IntegrityError:
+            raise ValidateErrorException(f"The dataset '{req.name.data}' already exists.")
 
     def get_dataset_queries(self, dataset_id: UUID, account: Account) -> list[DatasetQuery]:
         """Retrieve the most recent 10 query records for a dataset."""
-        # 1. Retrieve dataset and validate ownership
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
-            raise NotFoundException("The dataset does not exist.")
+        # 1. Validate dataset ownership
+        self._check_dataset_ownership(dataset_id, account)
 
         # 2. Query the latest 10 dataset queries
         dataset_queries = (
             self.db.session.query(DatasetQuery)
             .filter(DatasetQuery.dataset_id == dataset_id)
-            .order_by(desc("created_at"))
+            .order_by(desc(DatasetQuery.created_at))
             .limit(10)
             .all()
         )
@@ -88,34 +87,26 @@ class DatasetService(BaseService):
     def update_dataset(self, dataset_id: UUID, req: UpdateDatasetReq, account: Account) -> Dataset:
         """Update dataset information."""
         # 1. Retrieve dataset and validate ownership
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
-            raise NotFoundException("The dataset does not exist.")
+        dataset = self.get_dataset(dataset_id, account)
 
-        # 2. Check for name conflicts after update
-        check_dataset = self.db.session.query(Dataset).filter(
-            Dataset.account_id == account.id,
-            Dataset.name == req.name.data,
-            Dataset.id != dataset_id,
-        ).one_or_none()
-        if check_dataset:
-            raise ValidateErrorException(
-                f"The dataset name '{req.name.data}' already exists. Please choose another name."
-            )
-
-        # 3. Ensure description is not empty
+        # 2. Ensure description is not empty
         if req.description.data is None or req.description.data.strip() == "":
             req.description.data = DEFAULT_DATASET_DESCRIPTION_FORMATTER.format(
                 name=req.name.data
             )
 
-        # 4. Update dataset fields
-        self.update(
-            dataset,
-            name=req.name.data,
-            icon=req.icon.data,
-            description=req.description.data,
-        )
+        # 3. Update dataset fields, relying on the unique (account_id, name) index for name conflicts
+        try:
+            self.update(
+                dataset,
+                name=req.name.data,
+                icon=req.icon.data,
+                description=req.description.data,
+            )
+        except IntegrityError:
+            raise ValidateErrorException(
+                f"The dataset name '{req.name.data}' already exists. Please choose another name."
+            )
 
         return dataset
 
@@ -133,21 +124,28 @@ class DatasetService(BaseService):
         if req.search_word.data:
             filters.append(Dataset.name.ilike(f"%{req.search_word.data}%"))
 
-        # 3. Execute paginated query
+        # 3. Execute paginated query, loading only the columns the list view renders
         datasets = paginator.paginate(
             self.db.session.query(Dataset)
+            .options(load_only(
+                Dataset.id,
+                Dataset.name,
+                Dataset.icon,
+                Dataset.description,
+                Dataset.updated_at,
+                Dataset.created_at,
+            ))
             .filter(*filters)
-            .order_by(desc("created_at"))
+            .order_by(desc(Dataset.created_at), desc(Dataset.id)),
+            cursor_columns=(Dataset.created_at, Dataset.id),
         )
 
         return datasets, paginator
 
     def hit(self, dataset_id: UUID, req: HitReq, account: Account) -> list[dict]:
         """Run a retrieval test against the dataset."""
-        # 1. Retrieve dataset and validate ownership
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
-            raise NotFoundException("The dataset does not exist.")
+        # 1. Validate dataset ownership
+        self._check_dataset_ownership(dataset_id, account)
 
         # 2. Perform retrieval via retrieval service
         lc_documents = self.retrieval_service.search_in_datasets(
@@ -155,28 +153,25 @@ class DatasetService(BaseService):
             account_id=account.id,
             **req.data,
         )
-        lc_document_dict = {
-            str(doc.metadata["segment_id"]): doc for doc in lc_documents
-        }
-
-        # 3. Query corresponding segments
-        segments = self.db.session.query(Segment).filter(
-            Segment.id.in_([
-                str(doc.metadata["segment_id"]) for doc in lc_documents
-            ])
-        ).all()
-        segment_dict = {str(segment.id): segment for segment in segments}
 
-        # 4. Sort segments according to retrieval order
-        sorted_segments = [
-            segment_dict[str(doc.metadata["segment_id"])]
-            for doc in lc_documents
-            if str(doc.metadata["segment_id"]) in segment_dict
+        # 3. Extract segment IDs and scores once, preserving retrieval order
+        lc_entries = [
+            (str(lc_document.metadata["segment_id"]), lc_document.metadata["score"])
+            for lc_document in lc_documents
         ]
 
-        # 5. Assemble response payload
+        # 4. Query corresponding segments, joining their documents and upload files in the same round-trip
+        segments = self.db.session.query(Segment).options(
+            joinedload(Segment.document).joinedload(Document.upload_file),
+        ).filter(Segment.id.in_([segment_id for segment_id, _ in lc_entries])).all()
+        segment_dict = {str(segment.id): segment for segment in segments}
+
+        # 5. Assemble response payload in a single pass over the retrieval order
         hit_result = []
-        for segment in sorted_segments:
+        for segment_id, score in lc_entries:
+            segment = segment_dict.get(segment_id)
+            if segment is None:
+                continue
             document = segment.document
             upload_file = document.upload_file
             hit_result.append({
@@ -188,7 +183,7 @@ class DatasetService(BaseService):
                     "mime_type": upload_file.mime_type,
                 },
                 "dataset_id": segment.dataset_id,
-                "score": lc_document_dict[str(segment.id)].metadata["score"],
+                "score": score,
                 "position": segment.position,
                 "content": segment.content,
                 "keywords": segment.keywords,
@@ -199,8 +194,8 @@ class DatasetService(BaseService):
                 "disabled_at": datetime_to_timestamp(segment.disabled_at),
                 "status": segment.status,
                 "error": segment.error,
-                "updated_at": datetime_to_timestamp(segment.updated_at),
-                "created_at": datetime_to_timestamp(segment.created_at),
+                "updated_at": int(segment.updated_at.timestamp()),
+                "created_at": int(segment.created_at.timestamp()),
             })
 
         return hit_result
@@ -211,9 +206,7 @@ class DatasetService(BaseService):
         keywords, and vector database records.
         """
         # 1. Retrieve dataset and validate ownership
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
-            raise NotFoundException("The dataset does not exist.")
+        dataset = self.get_dataset(dataset_id, account)
 
         try:
             # 2. Delete dataset record and application associations
@@ -222,6 +215,7 @@ class DatasetService(BaseService):
                 self.db.session.query(AppDatasetJoin).filter(
                     AppDatasetJoin.dataset_id == dataset_id,
                 ).delete()
+            self.redis_client.delete(CACHE_DATASET_ACCOUNT_ID.format(dataset_id=dataset_id))
 
             # 3. Trigger async cleanup task
             delete_dataset.delay(dataset_id)
@@ -232,3 +226,33 @@ class DatasetService(BaseService):
                 {"dataset_id": dataset_id, "error": e},
             )
             raise FailException("Failed to delete dataset. Please try again later.")
+
+    def is_dataset_owned(self, dataset_id: UUID, account: Account) -> bool:
+        """Check whether the dataset exists and belongs to the account, memoized for the current request."""
+        # 1. Reuse the answer when this request has already checked the same dataset
+        checked = g.setdefault("dataset_ownership", {})
+        cache_key = (str(dataset_id), str(account.id))
+        if cache_key not in checked:
+            # 2. session.get is served from the identity map when the dataset is already loaded in this session
+            dataset = self.db.session.get(Dataset, dataset_id)
+            checked[cache_key] = dataset is not None and dataset.account_id == account.id
+
+        return checked[cache_key]
+
+    def _check_dataset_ownership(self, dataset_id: UUID, account: Account) -> None:
+        """Ensure the dataset exists and belongs to the account, caching the owner in Redis
+        so that hot read paths skip the database lookup."""
+        # 1. Read the cached owner, falling back to the database on a miss
+        cache_key = CACHE_DATASET_ACCOUNT_ID.format(dataset_id=dataset_id)
+        account_id = self.redis_client.get(cache_key)
+        if account_id is None:
+            account_id = self.db.session.query(Dataset.account_id).filter(Dataset.id == dataset_id).scalar()
+            if account_id is None:
+                raise NotFoundException("The dataset does not exist.")
+            self.redis_client.setex(cache_key, CACHE_DATASET_ACCOUNT_ID_EXPIRE_TIME, str(account_id))
+        elif isinstance(account_id, bytes):
+            account_id = account_id.decode()
+
+        # 2. Validate ownership
+        if str(account_id) != str(account.id):
+            raise NotFoundException("The dataset does not exist.")
@@ -12,19 +12,21 @@ from uuid import UUID
 
 from injector import inject
 from redis import Redis
-from sqlalchemy import desc, asc, func
+from sqlalchemy import desc, asc, func, insert
+from sqlalchemy.orm import joinedload, load_only
 
 from internal.entity.cache_entity import LOCK_DOCUMENT_UPDATE_ENABLED, LOCK_EXPIRE_TIME
 from internal.entity.dataset_entity import ProcessType, DocumentStatus, SegmentStatus
 from internal.entity.upload_file_entity import ALLOWED_DOCUMENT_EXTENSION
 from internal.exception import ForbiddenException, FailException, NotFoundException
 from internal.lib.helper import datetime_to_timestamp
-from internal.model import Dataset, Document, Segment, UploadFile, ProcessRule, Account
+from internal.model import Document, Segment, UploadFile, ProcessRule, Account
 from internal.schema.document_schema import GetDocumentsWithPageReq
 from internal.task.document_task import build_documents, update_document_enabled, delete_document
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
+from .dataset_service import DatasetService
 
 
 @inject
@@ -33,6 +35,7 @@ class DocumentService(BaseService):
     """Document Service"""
     db: SQLAlchemy
     redis_client: Redis
+    dataset_service: DatasetService
 
     def create_documents(
             self,
@@ -44,8 +47,7 @@ class DocumentService(BaseService):
     ) -> tuple[list[Document], str]:
         """Create a list of documents based on the provided information and trigger asynchronous processing."""
         # 1. Verify dataset permission
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
+        if not self.dataset_service.is_dataset_owned(dataset_id, account):
             raise ForbiddenException("The current user does not have access to this dataset or it does not exist.")
 
         # 2. Retrieve uploaded files and validate permissions and file extensions
@@ -79,55 +81,65 @@ class DocumentService(BaseService):
         # 4. Get the latest document position within the dataset
         position = self.get_latest_document_position(dataset_id)
 
-        # 5. Iterate through valid uploaded files and create document records
-        documents = []
-        for upload_file in upload_files:
-            position += 1
-            document = self.create(
-                Document,
-                account_id=account.id,
-                dataset_id=dataset_id,
-                upload_file_id=upload_file.id,
-                process_rule_id=process_rule.id,
-                batch=batch,
-                name=upload_file.name,
-                position=position,
-            )
-            documents.append(document)
+        # 5. Insert all document records with a single multi-row INSERT, returning only their IDs
+        with self.db.auto_commit():
+            document_ids = self.db.session.scalars(
+                insert(Document).returning(Document.id),
+                [{
+                    "account_id": account.id,
+                    "dataset_id": dataset_id,
+                    "upload_file_id": upload_file.id,
+                    "process_rule_id": process_rule.id,
+                    "batch": batch,
+                    "name": upload_file.name,
+                    "position": position + index,
+                } for index, upload_file in enumerate(upload_files, start=1)],
+            ).all()
 
         # 6. Trigger an asynchronous task for subsequent processing
-        build_documents.delay([document.id for document in documents])
+        build_documents.delay(document_ids)
+
+        # 7. Load the committed documents with one SELECT
+        documents = self.db.session.query(Document).filter(
+            Document.id.in_(document_ids),
+        ).order_by(asc("position")).all()
 
-        # 7. Return the document list and batch ID
+        # 8. Return the document list and batch ID
         return documents, batch
 
     def get_documents_status(self, dataset_id: UUID, batch: str, account: Account) -> list[dict]:
         """Retrieve document status for a given dataset ID and batch identifier."""
         # 1. Verify dataset permission
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
+        if not self.dataset_service.is_dataset_owned(dataset_id, account):
             raise ForbiddenException("The current user does not have access to this dataset or it does not exist.")
 
-        # 2. Query the list of documents under the dataset for the given batch
-        documents = self.db.session.query(Document).filter(
+        # 2. Query the list of documents under the dataset for the given batch, along with their upload files
+        documents = self.db.session.query(Document).options(
+            joinedload(Document.upload_file),
+        ).filter(
             Document.dataset_id == dataset_id,
             Document.batch == batch,
         ).order_by(asc("position")).all()
         if documents is None or len(documents) == 0:
             raise NotFoundException("No documents found for this batch. Please verify and try again.")
 
-        # 3. Iterate through the document list and extract their status information
+        # 3. Count total and completed segments for all documents in a single grouped query
+        segment_counts = self.db.session.query(
+            Segment.document_id,
+            func.count(Segment.id),
+            func.count(Segment.id).filter(Segment.status == SegmentStatus.COMPLETED),
+        ).filter(
+            Segment.document_id.in_([document.id for document in documents]),
+        ).group_by(Segment.document_id).all()
+        segment_count_dict = {
+            document_id: (segment_count, completed_segment_count)
+            for document_id, segment_count, completed_segment_count in segment_counts
+        }
+
+        # 4. Iterate through the document list and extract their status information
         documents_status = []
         for document in documents:
-            # 4. Count total and completed segments for each document
-            segment_count = self.db.session.query(func.count(Segment.id)).filter(
-                Segment.document_id == document.id,
-            ).scalar()
-            completed_segment_count = self.db.session.query(func.count(Segment.id)).filter(
-                Segment.document_id == document.id,
-                Segment.status == SegmentStatus.COMPLETED,
-            ).scalar()
-
+            segment_count, completed_segment_count = segment_count_dict.get(document.id, (0, 0))
             upload_file = document.upload_file
             documents_status.append({
                 "id": document.id,
@@ -146,7 +158,7 @@ class DocumentService(BaseService):
                 "indexing_completed_at": datetime_to_timestamp(document.indexing_completed_at),
                 "completed_at": datetime_to_timestamp(document.completed_at),
                 "stopped_at": datetime_to_timestamp(document.stopped_at),
-                "created_at": datetime_to_timestamp(document.created_at),
+                "created_at": int(document.created_at.timestamp()),
             })
 
         return documents_status
@@ -194,19 +206,21 @@ class DocumentService(BaseService):
         if document.enabled == enabled:
             raise FailException(f"Invalid operation: document is already {'enabled' if enabled else 'disabled'}.")
 
-        # 4. Check for an active lock key in Redis to avoid concurrent updates
+        # 4. Atomically acquire the update lock (expires in 600s) before writing, so concurrent requests cannot both pass
         cache_key = LOCK_DOCUMENT_UPDATE_ENABLED.format(document_id=document.id)
-        cache_result = self.redis_client.get(cache_key)
-        if cache_result is not None:
+        if not self.redis_client.set(cache_key, 1, ex=LOCK_EXPIRE_TIME, nx=True):
             raise FailException("The document’s enable state is being updated. Please try again later.")
 
-        # 5. Update the enabled state and set the cache lock (expires in 600s)
-        self.update(
-            document,
-            enabled=enabled,
-            disabled_at=None if enabled else datetime.now(),
-        )
-        self.redis_client.setex(cache_key, LOCK_EXPIRE_TIME, 1)
+        # 5. Update the enabled state, releasing the lock if the write fails
+        try:
+            self.update(
+                document,
+                enabled=enabled,
+                disabled_at=None if enabled else datetime.now(),
+            )
+        except Exception:
+            self.redis_client.delete(cache_key)
+            raise
 
         # 6. Trigger an asynchronous background task for vector DB updates
         update_document_enabled.delay(document.id)
@@ -239,8 +253,7 @@ class DocumentService(BaseService):
     ) -> tuple[list[Document], Paginator]:
         """Retrieve a paginated list of documents for a given dataset ID and query request."""
         # 1. Verify dataset permission
-        dataset = self.get(Dataset, dataset_id)
-        if dataset is None or dataset.account_id != account.id:
+        if not self.dataset_service.is_dataset_owned(dataset_id, account):
             raise NotFoundException("The specified dataset does not exist or you do not have permission.")
 
         # 2. Initialize paginator
@@ -254,16 +267,29 @@ class DocumentService(BaseService):
         if req.search_word.data:
             filters.append(Document.name.ilike(f"%{req.search_word.data}%"))
 
-        # 4. Execute paginated query
+        # 4. Execute paginated query, loading only the columns the list view renders
         documents = paginator.paginate(
-            self.db.session.query(Document).filter(*filters).order_by(desc("created_at"))
+            self.db.session.query(Document).options(
+                load_only(
+                    Document.id,
+                    Document.name,
+                    Document.character_count,
+                    Document.position,
+                    Document.enabled,
+                    Document.disabled_at,
+                    Document.status,
+                    Document.error,
+                    Document.updated_at,
+                    Document.created_at,
+                ),
+            ).filter(*filters).order_by(desc(Document.created_at), desc(Document.id)),
+            cursor_columns=(Document.created_at, Document.id),
         )
 
         return documents, paginator
 
     def get_latest_document_position(self, dataset_id: UUID) -> int:
         """Retrieve the latest document position for a given dataset."""
-        document = self.db.session.query(Document).filter(
+        return self.db.session.query(func.coalesce(func.max(Document.position), 0)).filter(
             Document.dataset_id == dataset_id,
-        ).order_by(desc("position")).first()
-        return document.position if document else 0
+        ).scalar()
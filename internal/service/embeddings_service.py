@@ -3,16 +3,67 @@
 """
 @File    : embeddings_service.py
 """
+import hashlib
 from dataclasses import dataclass
+from functools import lru_cache
 
+import numpy as np
 import tiktoken
 from injector import inject
 from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import EncoderBackedStore
 from langchain_community.storage import RedisStore
 from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from redis import Redis
 
+# Embedding model used for documents and queries
+EMBEDDINGS_MODEL = "text-embedding-3-small"
+
+# Cached document embeddings: keyed by model and text hash, stored as float16 bytes, expiring after 7 days
+EMBEDDINGS_CACHE_NAMESPACE = f"embeddings:{EMBEDDINGS_MODEL}:fp16:"
+EMBEDDINGS_CACHE_EXPIRE_TIME = 7 * 24 * 60 * 60
+
+
+def _encode_cache_key(text: str) -> str:
+    """Build the cache key for a text from its SHA-1 hash"""
+    return EMBEDDINGS_CACHE_NAMESPACE + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _serialize_embedding(vector: list[float]) -> bytes:
+    """Pack an embedding as float16 bytes"""
+    return np.asarray(vector, dtype=np.float16).tobytes()
+
+
+def _deserialize_embedding(data: bytes) -> list[float]:
+    """Unpack float16 bytes back into an embedding"""
+    return np.frombuffer(data, dtype=np.float16).astype(np.float32).tolist()
+
+
+def _quantize_embedding(vector: list[float]) -> list[float]:
+    """Round an embedding to float16 precision, exactly the values a cache round-trip yields"""
+    return np.asarray(vector, dtype=np.float16).astype(np.float32).tolist()
+
+
+class _Float16Embeddings(Embeddings):
+    """Embeddings wrapper that rounds every vector to the float16 precision the cache stores,
+    so the same text gets identical vectors whether or not the cache was warm"""
+
+    def __init__(self, embeddings: Embeddings):
+        self._embeddings = embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [_quantize_embedding(vector) for vector in self._embeddings.embed_documents(texts)]
+
+    def embed_query(self, text: str) -> list[float]:
+        return _quantize_embedding(self._embeddings.embed_query(text))
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    """Load the tokenizer once per process and share it across calls"""
+    return tiktoken.encoding_for_model("gpt-3.5")
+
 
 @inject
 @dataclass
@@ -24,7 +75,7 @@ class EmbeddingsService:
 
     def __init__(self, redis: Redis):
         """Constructor: initialize the embedding client, store, and cache-backed client"""
-        self._store = RedisStore(client=redis)
+        self._store = RedisStore(client=redis, ttl=EMBEDDINGS_CACHE_EXPIRE_TIME)
         # self._embeddings = HuggingFaceEmbeddings(
         #     model_name="Alibaba-NLP/gte-multilingual-base",
         #     cache_folder=os.path.join(os.getcwd(), "internal", "core", "embeddings"),
@@ -32,18 +83,28 @@ class EmbeddingsService:
         #         "trust_remote_code": True,
         #     }
         # )
-        self._embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        self._cache_backed_embeddings = CacheBackedEmbeddings.from_bytes_store(
+        # Vectors are rounded to float16 on every path, matching what the cache serves on a hit
+        self._embeddings = _Float16Embeddings(OpenAIEmbeddings(model=EMBEDDINGS_MODEL))
+        self._cache_backed_embeddings = CacheBackedEmbeddings(
             self._embeddings,
-            self._store,
-            namespace="embeddings",
+            EncoderBackedStore(
+                store=self._store,
+                key_encoder=_encode_cache_key,
+                value_serializer=_serialize_embedding,
+                value_deserializer=_deserialize_embedding,
+            ),
         )
 
     @classmethod
+    @lru_cache(maxsize=8192)
     def calculate_token_count(cls, query: str) -> int:
-        """Compute the token count for the given text"""
-        encoding = tiktoken.encoding_for_model("gpt-3.5")
-        return len(encoding.encode(query))
+        """Compute the token count for the given text, memoized since splitters measure the same text repeatedly"""
+        return len(_get_encoding().encode(query))
+
+    @classmethod
+    def calculate_token_counts(cls, queries: list[str]) -> list[int]:
+        """Compute the token count for each text in a single batched tokenizer call"""
+        return [len(tokens) for tokens in _get_encoding().encode_batch(queries)]
 
     @property
     def store(self) -> RedisStore:
@@ -4,11 +4,22 @@
 @File    : faiss_service.py
 """
 import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-from injector import inject
+import faiss
+import numpy as np
+from injector import inject, singleton
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.document_loaders import TextLoader
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain_core.tools import BaseTool, tool
 
@@ -16,12 +27,89 @@ from internal.core.agent.entities.agent_entity import DATASET_RETRIEVAL_TOOL_NAM
 from internal.lib.helper import combine_documents
 from .embeddings_service import EmbeddingsService
 
+# HNSW graph parameters for the markdown-backed index
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 50
+
+# Markdown chunks are embedded in concurrent batches when building the index
+EMBEDDING_BATCH_SIZE = 500
+EMBEDDING_MAX_WORKERS = 4
+
+# Product quantization parameters, used once there are enough vectors to train the codebooks
+PQ_M = 96  # Sub-quantizers per vector (96-byte codes with 8-bit codes)
+PQ_NBITS = 8
+IVF_NLIST = 64
+IVF_NPROBE = 8
+PQ_MIN_TRAINING_VECTORS = 39 * (1 << PQ_NBITS)  # FAISS recommends ~39 training points per centroid
+
+
+class _SemanticCache:
+    """Thread-safe LRU cache of retrieval results keyed by query embedding.
+    A lookup hits when the cosine similarity to a cached query reaches the threshold,
+    so repeated and near-duplicate queries skip the FAISS search entirely.
+    """
+
+    def __init__(self, capacity: int = 512, threshold: float = 0.95):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # Unit vectors, one row per slot
+        self._entries: OrderedDict[int, str] = OrderedDict()  # slot -> result, least recently used first
+
+    def get(self, embedding: np.ndarray) -> Optional[str]:
+        """Return the cached result of the most similar query, or None on a miss"""
+        with self._lock:
+            if not self._entries:
+                return None
+
+            # 1. Occupied slots are always 0..n-1, so score them all with a single matrix-vector product
+            similarities = self._vectors[:len(self._entries)] @ embedding
+            slot = int(np.argmax(similarities))
+            if similarities[slot] < self.threshold:
+                return None
+
+            # 2. Mark the entry as most recently used
+            self._entries.move_to_end(slot)
+            return self._entries[slot]
+
+    def put(self, embedding: np.ndarray, result: str) -> None:
+        """Cache a result, evicting the least recently used entry when full"""
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, embedding.shape[0]), dtype=np.float32)
+
+            if len(self._entries) >= self.capacity:
+                slot, _ = self._entries.popitem(last=False)
+            else:
+                slot = len(self._entries)
+            self._vectors[slot] = embedding
+            self._entries[slot] = result
+
+
+def _load_vector_store(folder_path: str, embeddings: Embeddings) -> FAISS:
+    """Load a FAISS store from disk with the distance strategy matching its index metric.
+    Stores from FaissIndexBuilder hold unit-normalized vectors in an inner-product index, while stores built
+    before it are flat L2 indexes; vectors are normalized explicitly, so LangChain's normalize_L2 stays off."""
+    vector_store = FAISS.load_local(
+        folder_path=folder_path,
+        embeddings=embeddings,
+        allow_dangerous_deserialization=True,
+    )
+    if vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        vector_store.distance_strategy = DistanceStrategy.MAX_INNER_PRODUCT
+    else:
+        vector_store.distance_strategy = DistanceStrategy.EUCLIDEAN_DISTANCE
+    return vector_store
+
 
 @inject
+@singleton
 class FaissService:
-    """Faiss Vector Database Service"""
-    faiss: FAISS
+    """Faiss Vector Database Service, one instance per process so the index is loaded once"""
+    vector_store: FAISS
     embeddings_service: EmbeddingsService
+    semantic_cache: _SemanticCache
 
     def __init__(self, embeddings_service: EmbeddingsService):
         """Constructor: initializes the Faiss vector database"""
@@ -32,24 +120,38 @@ class FaissService:
         internal_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         faiss_vector_store_path = os.path.join(internal_path, "core", "vector_store")
 
-        # 3. Initialize the Faiss vector database
-        self.faiss = FAISS.load_local(
-            folder_path=faiss_vector_store_path,
-            embeddings=self.embeddings_service.embeddings,
-            allow_dangerous_deserialization=True,
-        )
+        # 3. Initialize the Faiss vector database with the distance strategy its index was built for
+        self.vector_store = _load_vector_store(faiss_vector_store_path, self.embeddings_service.embeddings)
+        if isinstance(self.vector_store.index, faiss.IndexHNSW):
+            self.vector_store.index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif isinstance(self.vector_store.index, faiss.IndexIVF):
+            self.vector_store.index.nprobe = IVF_NPROBE
+            self.vector_store.index.make_direct_map()  # MMR reconstructs candidate vectors by id
 
-    def convert_faiss_to_tool(self) -> BaseTool:
-        """Convert the Faiss vector database retriever into a LangChain tool"""
-        # 1. Convert Faiss database into a retriever
-        retrieval = self.faiss.as_retriever(
-            search_type="mmr",
-            search_kwargs={"k": 5, "fetch_k": 20},
-        )
+        # 4. Initialize the semantic cache for hot retrieval queries
+        self.semantic_cache = _SemanticCache()
 
-        # 2. Build a retrieval chain and merge retrieved documents into a string
-        search_chain = retrieval | combine_documents
+    def search(self, query: str) -> str:
+        """Run an MMR search for the query and merge the retrieved documents into a string,
+        serving repeated or near-duplicate queries from the semantic cache"""
+        # 1. Embed the query once and normalize it for cosine similarity
+        embedding = np.asarray(self.embeddings_service.embeddings.embed_query(query), dtype=np.float32)
+        embedding /= np.linalg.norm(embedding) or 1.0
 
+        # 2. Return the cached result of a sufficiently similar query
+        result = self.semantic_cache.get(embedding)
+        if result is not None:
+            return result
+
+        # 3. On a miss, reuse the embedding for the MMR search and cache the merged result
+        documents = self.vector_store.max_marginal_relevance_search_by_vector(embedding.tolist(), k=5, fetch_k=20)
+        result = combine_documents(documents)
+        self.semantic_cache.put(embedding, result)
+
+        return result
+
+    def convert_faiss_to_tool(self) -> BaseTool:
+        """Convert the Faiss vector database retriever into a LangChain tool"""
         class DatasetRetrievalInput(BaseModel):
             """Input schema for the knowledge base retrieval tool"""
             query: str = Field(description="Query string for knowledge base retrieval")
@@ -59,7 +161,7 @@ class FaissService:
             """Use this tool to retrieve extended knowledge base content.
             When a user question exceeds your knowledge scope,
             you may call this tool with a query string and return the retrieved content."""
-            return search_chain.invoke(query)
+            return self.search(query)
 
         return dataset_retrieval
 
@@ -119,29 +221,75 @@ class FaissIndexBuilder:
         documents = splitter.split_documents(raw_documents)
 
         # 3. Create or update FAISS index
-        if overwrite:
-            # Create a brand-new index
-            faiss = FAISS.from_documents(
-                documents,
-                self.embeddings_service.embeddings,  # uses OpenAIEmbeddings from EmbeddingsService
+        if not overwrite and os.path.exists(vector_store_path) and os.listdir(vector_store_path):
+            # Append to the existing index
+            vector_store = _load_vector_store(vector_store_path, self.embeddings_service.embeddings)
+            vector_store.add_embeddings(
+                text_embeddings=zip([document.page_content for document in documents], self._embed_documents(documents)),
+                metadatas=[document.metadata for document in documents],
             )
         else:
-            # Append to existing index if it exists, otherwise create new
-            if os.path.exists(vector_store_path) and os.listdir(vector_store_path):
-                faiss = FAISS.load_local(
-                    folder_path=vector_store_path,
-                    embeddings=self.embeddings_service.embeddings,
-                    allow_dangerous_deserialization=True,
-                )
-                faiss.add_documents(documents)
-            else:
-                faiss = FAISS.from_documents(
-                    documents,
-                    self.embeddings_service.embeddings,
-                )
+            # Create a brand-new index
+            vector_store = self._create_vector_store(documents)
 
         # 4. Persist FAISS index to disk
-        faiss.save_local(vector_store_path)
+        vector_store.save_local(vector_store_path)
+
+    def _create_vector_store(self, documents: list[Document]) -> FAISS:
+        """Embed the documents and store them in an inner-product HNSW index, or a product-quantized
+        IVF index once the store is large enough, instead of the default flat L2 index"""
+        # 1. Embed all chunks
+        vectors = self._embed_documents(documents)
+
+        # 2. Build the index over the vectors
+        index = self._create_index(vectors)
+        index.add(vectors)
+        if isinstance(index, faiss.IndexIVF):
+            index.make_direct_map()
+
+        # 3. Wrap the index and documents into a LangChain FAISS vector store
+        ids = [str(uuid.uuid4()) for _ in documents]
+        return FAISS(
+            embedding_function=self.embeddings_service.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        )
+
+    def _embed_documents(self, documents: list[Document]) -> np.ndarray:
+        """Embed the documents in concurrent batches and L2-normalize them so inner product equals cosine similarity"""
+        # 1. Split the chunk texts into batches, each sent as a single embeddings request
+        texts = [document.page_content for document in documents]
+        batches = [texts[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+
+        # 2. Embed the batches concurrently, preserving document order
+        with ThreadPoolExecutor(max_workers=EMBEDDING_MAX_WORKERS) as executor:
+            vectors = np.asarray(
+                [vector for batch in executor.map(self.embeddings_service.embeddings.embed_documents, batches)
+                 for vector in batch],
+                dtype=np.float32,
+            )
+        faiss.normalize_L2(vectors)
+
+        return vectors
+
+    @classmethod
+    def _create_index(cls, vectors: np.ndarray) -> faiss.Index:
+        """Create an empty inner-product index sized for the given normalized vectors"""
+        count, dim = vectors.shape
+
+        # 1. Small stores cannot train PQ codebooks, so keep full-precision vectors in an HNSW graph
+        if count < PQ_MIN_TRAINING_VECTORS or dim % PQ_M != 0:
+            index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            return index
+
+        # 2. Large stores keep PQ_M-byte codes per vector instead of 4 * dim bytes of float32
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, IVF_NLIST, PQ_M, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        return index
 
 # Optional standalone entrypoint: build the vector store & test loading
 # if __name__ == "__main__":
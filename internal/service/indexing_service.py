@@ -6,18 +6,24 @@
 import logging
 import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from uuid import UUID
 
+from flask import Flask, current_app
 from injector import inject
 from langchain_core.documents import Document as LCDocument
 from redis import Redis
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert
 from weaviate.classes.query import Filter
 
 from internal.core.file_extractor import FileExtractor
-from internal.entity.cache_entity import LOCK_DOCUMENT_UPDATE_ENABLED
+from internal.entity.cache_entity import (
+    LOCK_DOCUMENT_UPDATE_ENABLED,
+    LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE,
+    LOCK_EXPIRE_TIME,
+)
 from internal.entity.dataset_entity import DocumentStatus, SegmentStatus
 from internal.exception import NotFoundException
 from internal.lib.helper import generate_text_hash
@@ -30,6 +36,17 @@ from .keyword_table_service import KeywordTableService
 from .process_rule_service import ProcessRuleService
 from .vector_database_service import VectorDatabaseService
 
+# Number of concurrent requests used to update vector record properties
+VECTOR_UPDATE_MAX_WORKERS = 8
+
+# Escaped special-token brackets ("<|" and "|>") collapsed to plain brackets while cleaning extracted text
+SPECIAL_TOKEN_BRACKET_PATTERN = re.compile(r'(<)\||\|(>)')
+
+# Control characters and invalid code points dropped while cleaning extracted text
+EXTRA_TEXT_TRANSLATION = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F, 0xEF, 0xBF, 0xBE, 0xFFFE],
+)
+
 
 @inject
 @dataclass
@@ -48,34 +65,56 @@ class IndexingService(BaseService):
         """Build knowledge-base documents for the given list of document IDs.
 
         This includes loading, splitting, building indexes, and storing data.
+        Documents are built concurrently on a thread pool bounded by INDEXING_MAX_WORKERS.
         """
-        # 1. Fetch all documents by the given IDs
-        documents = (
-            self.db.session.query(Document)
-            .filter(Document.id.in_(document_ids))
-            .all()
-        )
+        flask_app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=flask_app.config["INDEXING_MAX_WORKERS"]) as executor:
+            futures = {
+                executor.submit(self._build_document, flask_app, document_id): document_id
+                for document_id in document_ids
+            }
+
+        # Errors raised outside a document's own error handling would otherwise vanish with the future,
+        # so log every failure and re-raise the first one to fail the task as before
+        errors = []
+        for future, document_id in futures.items():
+            error = future.exception()
+            if error is not None:
+                logging.error(
+                    "Failed to build document. document_id: %(document_id)s, error: %(error)s",
+                    {"document_id": document_id, "error": error},
+                    exc_info=error,
+                )
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+    def _build_document(self, flask_app: Flask, document_id: UUID) -> None:
+        """Build a single document inside its own app context, and therefore its own database session."""
+        with flask_app.app_context():
+            # 1. Fetch the document by the given ID
+            document = self.get(Document, document_id)
+            if document is None:
+                return
 
-        # 2. Iterate through all documents and build each one
-        for document in documents:
             try:
-                # 3. Update current status to PARSING and record the start time
+                # 2. Update current status to PARSING and record the start time
                 self.update(
                     document,
                     status=DocumentStatus.PARSING,
                     processing_started_at=datetime.now(),
                 )
 
-                # 4. Parse/load the document and update document status/time
+                # 3. Parse/load the document and update document status/time
                 lc_documents = self._parsing(document)
 
-                # 5. Split the document into segments and update status/time
+                # 4. Split the document into segments and update status/time
                 lc_segments = self._splitting(document, lc_documents)
 
-                # 6. Build indexes (keywords, vectors) and update status
+                # 5. Build indexes (keywords, vectors) and update status
                 self._indexing(document, lc_segments)
 
-                # 7. Persist results (update document status + store vectors)
+                # 6. Persist results (update document status + store vectors)
                 self._completed(document, lc_segments)
 
             except Exception as e:
@@ -104,60 +143,75 @@ class IndexingService(BaseService):
             )
             raise NotFoundException("Document does not exist")
 
-        # 3. Query node IDs for all completed segments under this document
+        # 3. Query node IDs and keywords for all completed segments under this document
         segments = (
             self.db.session.query(Segment)
-            .with_entities(Segment.id, Segment.node_id, Segment.enabled)
+            .with_entities(Segment.id, Segment.node_id, Segment.enabled, Segment.keywords)
             .filter(
                 Segment.document_id == document_id,
                 Segment.status == SegmentStatus.COMPLETED,
             )
             .all()
         )
-        segment_ids = [id for id, _, _ in segments]
-        node_ids = [node_id for _, node_id, _ in segments]
+
+        # 4. Split the rows into the ID lists and keyword set used below in a single pass
+        segment_ids, enabled_segment_ids, keywords = [], [], set()
+        for segment_id, _, enabled, segment_keywords in segments:
+            segment_ids.append(segment_id)
+            if enabled is True:
+                enabled_segment_ids.append(segment_id)
+            keywords.update(segment_keywords)
 
         try:
-            # 4. Loop through all node_ids and update vector records
+            # 5. Update the document_enabled property of every vector record. Weaviate has no
+            #    filter-based update, so the per-object requests are issued concurrently instead
             collection = self.vector_database_service.collection
-            for node_id in node_ids:
-                try:
-                    collection.data.update(
+            with ThreadPoolExecutor(max_workers=VECTOR_UPDATE_MAX_WORKERS) as executor:
+                futures = [
+                    (segment_id, executor.submit(
+                        collection.data.update,
                         uuid=node_id,
-                        properties={
-                            "document_enabled": document.enabled,
-                        },
-                    )
-                except Exception as e:
-                    with self.db.auto_commit():
-                        self.db.session.query(Segment).filter(
-                            Segment.node_id == node_id,
-                        ).update({
+                        properties={"document_enabled": document.enabled},
+                    ))
+                    for segment_id, node_id, _, _ in segments
+                ]
+            failed_segments = [
+                (segment_id, future.exception()) for segment_id, future in futures if future.exception()
+            ]
+
+            # 6. Mark every segment whose vector record could not be updated as errored in one bulk UPDATE
+            if failed_segments:
+                with self.db.auto_commit():
+                    self.db.session.bulk_update_mappings(Segment, [
+                        {
+                            "id": segment_id,
                             "error": str(e),
                             "status": SegmentStatus.ERROR,
                             "enabled": False,
                             "disabled_at": datetime.now(),
                             "stopped_at": datetime.now(),
-                        })
+                        }
+                        for segment_id, e in failed_segments
+                    ])
 
-            # 5. Update keyword table accordingly
+            # 7. Update keyword table accordingly
             #    (enabled=False => remove keywords; enabled=True => add keywords)
             if document.enabled is True:
-                # 6. Switching from disabled to enabled: add keywords back
-                enabled_segment_ids = [id for id, _, enabled in segments if enabled is True]
+                # 8. Switching from disabled to enabled: add keywords back
                 self.keyword_table_service.add_keyword_table_from_ids(
                     document.dataset_id,
                     enabled_segment_ids,
                 )
             else:
-                # 7. Switching from enabled to disabled: remove keywords
+                # 9. Switching from enabled to disabled: remove keywords, scanning only the ones these segments carry
                 self.keyword_table_service.delete_keyword_table_from_ids(
                     document.dataset_id,
                     segment_ids,
+                    list(keywords),
                 )
 
         except Exception as e:
-            # 5. Log the error and revert enabled status back to the original value
+            # 10. Log the error and revert enabled status back to the original value
             logging.exception(
                 "Failed to update document enabled status in vector DB. "
                 "document_id: %(document_id)s, error: %(error)s",
@@ -171,64 +225,70 @@ class IndexingService(BaseService):
             )
 
         finally:
-            # 6. Clear the cache key to indicate the async task is completed
+            # 11. Clear the cache key to indicate the async task is completed
             self.redis_client.delete(cache_key)
 
     def delete_document(self, dataset_id: UUID, document_id: UUID) -> None:
         """Delete a document by dataset_id + document_id."""
-        # 1. Find all segment IDs under the document
-        segment_ids = [
-            str(id) for id, in (
-                self.db.session.query(Segment)
-                .with_entities(Segment.id)
-                .filter(Segment.document_id == document_id)
-                .all()
+        # 1. Delete associated records in the vector database in the background, overlapping the Postgres delete
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            vector_future = executor.submit(
+                self.vector_database_service.collection.data.delete_many,
+                where=Filter.by_property("document_id").equal(str(document_id)),
             )
-        ]
-
-        # 2. Delete associated records in the vector database
-        collection = self.vector_database_service.collection
-        collection.data.delete_many(
-            where=Filter.by_property("document_id").equal(document_id),
-        )
-
-        # 3. Delete related segment records in Postgres
-        with self.db.auto_commit():
-            self.db.session.query(Segment).filter(
-                Segment.document_id == document_id,
-            ).delete()
 
-        # 4. Delete keyword records for the segment IDs
-        self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, segment_ids)
+            # 2. Delete related segment records in Postgres, returning their IDs and keywords in the same statement
+            with self.db.auto_commit():
+                segment_ids, keywords = [], set()
+                for segment_id, segment_keywords in self.db.session.execute(
+                        delete(Segment)
+                        .where(Segment.document_id == document_id)
+                        .returning(Segment.id, Segment.keywords)
+                        .execution_options(synchronize_session=False),
+                ):
+                    segment_ids.append(str(segment_id))
+                    keywords.update(segment_keywords)
+
+        # 3. Delete keyword records for the segment IDs, scanning only the keywords those segments carried. This runs
+        #    before the vector result is checked: the segment rows are already gone, so a vector failure must not
+        #    leave their IDs in the keyword table with nothing left to clean them up from
+        self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, segment_ids, list(keywords))
+
+        # 4. Surface any error raised by the vector database deletion
+        vector_future.result()
 
     def delete_dataset(self, dataset_id: UUID) -> None:
         """Delete a dataset and all associated records."""
         try:
-            with self.db.auto_commit():
-                # 1. Delete associated document records
-                self.db.session.query(Document).filter(
-                    Document.dataset_id == dataset_id,
-                ).delete()
+            # 1. Delete associated records in the vector database in the background, since it is
+            #    independent of Postgres and can overlap with the deletions below
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                vector_future = executor.submit(
+                    self.vector_database_service.collection.data.delete_many,
+                    where=Filter.by_property("dataset_id").equal(str(dataset_id)),
+                )
 
-                # 2. Delete associated segment records
-                self.db.session.query(Segment).filter(
+                # 2. Delete associated document, segment, keyword table and dataset query records in one
+                #    statement, chaining the deletes as data-modifying CTEs so Postgres runs them in a single round trip
+                deleted_documents = delete(Document).where(
+                    Document.dataset_id == dataset_id,
+                ).returning(Document.id).cte("deleted_documents")
+                deleted_segments = delete(Segment).where(
                     Segment.dataset_id == dataset_id,
-                ).delete()
-
-                # 3. Delete associated keyword table records
-                self.db.session.query(KeywordTable).filter(
+                ).returning(Segment.id).cte("deleted_segments")
+                deleted_keyword_tables = delete(KeywordTable).where(
                     KeywordTable.dataset_id == dataset_id,
-                ).delete()
+                ).returning(KeywordTable.id).cte("deleted_keyword_tables")
+                with self.db.auto_commit():
+                    self.db.session.execute(
+                        delete(DatasetQuery)
+                        .where(DatasetQuery.dataset_id == dataset_id)
+                        .add_cte(deleted_documents, deleted_segments, deleted_keyword_tables)
+                        .execution_options(synchronize_session=False),
+                    )
 
-                # 4. Delete dataset query records
-                self.db.session.query(DatasetQuery).filter(
-                    DatasetQuery.dataset_id == dataset_id,
-                ).delete()
-
-            # 5. Delete associated records in the vector database
-            self.vector_database_service.collection.data.delete_many(
-                where=Filter.by_property("dataset_id").equal(str(dataset_id)),
-            )
+            # 3. Surface any error raised by the vector database deletion
+            vector_future.result()
 
         except Exception as e:
             logging.exception(
@@ -277,46 +337,60 @@ class IndexingService(BaseService):
             # 3. Split documents into segments
             lc_segments = text_splitter.split_documents(lc_documents)
 
-            # 4. Get the maximum segment position for the document
-            position = (
-                self.db.session.query(func.coalesce(func.max(Segment.position), 0))
-                .filter(Segment.document_id == document.id)
-                .scalar()
+            # 4. Get the maximum segment position for the document; a document that has never
+            #    been split has no segments yet, so the lookup is skipped on first-time indexing
+            position = 0
+            if document.splitting_completed_at is not None:
+                position = (
+                    self.db.session.query(func.coalesce(func.max(Segment.position), 0))
+                    .filter(Segment.document_id == document.id)
+                    .scalar()
+                )
+
+            # 5. Compute token counts for all segments in one tokenizer call
+            token_counts = self.embeddings_service.calculate_token_counts(
+                [lc_segment.page_content for lc_segment in lc_segments]
             )
 
-            # 5. Process segments, attach metadata, and store them in Postgres
-            segments = []
-            for lc_segment in lc_segments:
-                position += 1
-                content = lc_segment.page_content
-                segment = self.create(
-                    Segment,
-                    account_id=document.account_id,
-                    dataset_id=document.dataset_id,
-                    document_id=document.id,
-                    node_id=uuid.uuid4(),
-                    position=position,
-                    content=content,
-                    character_count=len(content),
-                    token_count=self.embeddings_service.calculate_token_count(content),
-                    hash=generate_text_hash(content),
-                    status=SegmentStatus.WAITING,
-                )
+            # 6. Hash each distinct segment text once, since boilerplate (headers, footers) repeats across segments
+            text_hashes = {
+                content: generate_text_hash(content)
+                for content in {lc_segment.page_content for lc_segment in lc_segments}
+            }
+
+            # 7. Insert all segments with one executemany, generating IDs client-side so nothing has to be read back
+            rows = [{
+                "id": uuid.uuid4(),
+                "account_id": document.account_id,
+                "dataset_id": document.dataset_id,
+                "document_id": document.id,
+                "node_id": uuid.uuid4(),
+                "position": position + index,
+                "content": lc_segment.page_content,
+                "character_count": len(lc_segment.page_content),
+                "token_count": token_count,
+                "hash": text_hashes[lc_segment.page_content],
+                "status": SegmentStatus.WAITING,
+            } for index, (lc_segment, token_count) in enumerate(zip(lc_segments, token_counts), start=1)]
+            with self.db.auto_commit():
+                self.db.session.execute(insert(Segment), rows)
+
+            # 8. Attach segment metadata used by the indexing and vector store steps
+            for lc_segment, row in zip(lc_segments, rows):
                 lc_segment.metadata = {
                     "account_id": str(document.account_id),
                     "dataset_id": str(document.dataset_id),
                     "document_id": str(document.id),
-                    "segment_id": str(segment.id),
-                    "node_id": str(segment.node_id),
+                    "segment_id": str(row["id"]),
+                    "node_id": str(row["node_id"]),
                     "document_enabled": False,
                     "segment_enabled": False,
                 }
-                segments.append(segment)
 
-            # 6. Update document fields: status, token_count, timestamps, etc.
+            # 9. Update document fields: status, token_count, timestamps, etc.
             self.update(
                 document,
-                token_count=sum(segment.token_count for segment in segments),
+                token_count=sum(token_counts),
                 status=DocumentStatus.INDEXING,
                 splitting_completed_at=datetime.now(),
             )
@@ -324,44 +398,52 @@ class IndexingService(BaseService):
             return lc_segments
 
         except Exception as e:
-            print("Exception in _splitting:", e)
+            logging.exception(
+                "Failed to split the document. document_id: %(document_id)s, error: %(error)s",
+                {"document_id": document.id, "error": e},
+            )
+            raise
 
     def _indexing(self, document: Document, lc_segments: list[LCDocument]) -> None:
         """Build indexes for the segments, including keyword extraction and keyword table updates."""
-        for lc_segment in lc_segments:
-            # 1. Extract up to 10 keywords for each segment
-            keywords = self.jieba_service.extract_keywords(lc_segment.page_content, 10)
-
-            # 2. Update segment keywords and status
-            self.db.session.query(Segment).filter(
-                Segment.id == lc_segment.metadata["segment_id"],
-            ).update({
-                "keywords": keywords,
-                "status": SegmentStatus.INDEXING,
-                "indexing_completed_at": datetime.now(),
-            })
-
-            # 3. Get the keyword table for the dataset
-            keyword_table_record = self.keyword_table_service.get_keyword_table_from_dataset_id(
-                document.dataset_id,
-            )
-            keyword_table = {
-                field: set(value) for field, value in keyword_table_record.keyword_table.items()
-            }
+        # 1. Extract up to 10 keywords for each segment
+        segment_keywords = [
+            (lc_segment.metadata["segment_id"], self.jieba_service.extract_keywords(lc_segment.page_content, 10))
+            for lc_segment in lc_segments
+        ]
 
-            # 4. Add new keywords to the keyword table
-            for keyword in keywords:
-                if keyword not in keyword_table:
-                    keyword_table[keyword] = set()
-                keyword_table[keyword].add(lc_segment.metadata["segment_id"])
+        # 2. Update keywords and status of all segments in a single bulk UPDATE
+        indexing_completed_at = datetime.now()
+        with self.db.auto_commit():
+            self.db.session.bulk_update_mappings(Segment, [
+                {
+                    "id": UUID(segment_id),
+                    "keywords": keywords,
+                    "status": SegmentStatus.INDEXING,
+                    "indexing_completed_at": indexing_completed_at,
+                }
+                for segment_id, keywords in segment_keywords
+            ])
 
-            # 5. Update the keyword table record
-            self.update(
-                keyword_table_record,
-                keyword_table={field: list(value) for field, value in keyword_table.items()},
+        # 3. Merge the keywords into the dataset's keyword table and persist it once.
+        #    Lock this operation to avoid incorrect data under concurrency.
+        cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=document.dataset_id)
+        with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
+            keyword_table_record = self.keyword_table_service.get_keyword_table_from_dataset_id(
+                document.dataset_id,
             )
-
-        # 6. Update document timestamp/status
+            keyword_table = keyword_table_record.keyword_table.copy()
+            updated_postings = {}
+            for segment_id, keywords in segment_keywords:
+                for keyword in keywords:
+                    if keyword not in updated_postings:
+                        updated_postings[keyword] = set(keyword_table.get(keyword, []))
+                    updated_postings[keyword].add(segment_id)
+            keyword_table.update({field: list(value) for field, value in updated_postings.items()})
+
+            self.update(keyword_table_record, keyword_table=keyword_table)
+
+        # 4. Update document timestamp/status
         self.update(
             document,
             indexing_completed_at=datetime.now(),
@@ -374,20 +456,46 @@ class IndexingService(BaseService):
             lc_segment.metadata["document_enabled"] = True
             lc_segment.metadata["segment_enabled"] = True
 
-        # 2. Write to the vector DB in batches of 10 to avoid oversized requests
+        # 2. Embed all segments in one call; the embeddings client splits it into maximal API requests itself
+        node_ids = [lc_segment.metadata["node_id"] for lc_segment in lc_segments]
         try:
-            for i in range(0, len(lc_segments), 10):
-                chunks = lc_segments[i:i + 10]
-                ids = [chunk.metadata["node_id"] for chunk in chunks]
-                self.vector_database_service.vector_store.add_documents(chunks, ids=ids)
-                with self.db.auto_commit():
+            vectors = self.embeddings_service.cache_backed_embeddings.embed_documents(
+                [lc_segment.page_content for lc_segment in lc_segments]
+            )
+
+            # 3. Stream all objects through Weaviate's batcher with the configured batch size and concurrency
+            collection = self.vector_database_service.collection
+            with collection.batch.fixed_size(
+                    batch_size=current_app.config["WEAVIATE_BATCH_SIZE"],
+                    concurrent_requests=current_app.config["WEAVIATE_BATCH_CONCURRENT_REQUESTS"],
+            ) as batch:
+                for lc_segment, node_id, vector in zip(lc_segments, node_ids, vectors):
+                    batch.add_object(
+                        properties={"text": lc_segment.page_content, **lc_segment.metadata},
+                        uuid=node_id,
+                        vector=vector,
+                    )
+            failed_objects = {str(failed.object_.uuid): failed.message for failed in collection.batch.failed_objects}
+
+            # 4. Mark stored segments as completed and rejected ones as errored
+            with self.db.auto_commit():
+                self.db.session.query(Segment).filter(
+                    Segment.node_id.in_([node_id for node_id in node_ids if node_id not in failed_objects]),
+                ).update({
+                    "status": SegmentStatus.COMPLETED,
+                    "completed_at": datetime.now(),
+                    "enabled": True,
+                }, synchronize_session=False)
+                for node_id, error in failed_objects.items():
                     self.db.session.query(Segment).filter(
-                        Segment.node_id.in_(ids),
+                        Segment.node_id == node_id,
                     ).update({
-                        "status": SegmentStatus.COMPLETED,
-                        "completed_at": datetime.now(),
-                        "enabled": True,
-                    })
+                        "status": SegmentStatus.ERROR,
+                        "completed_at": None,
+                        "stopped_at": datetime.now(),
+                        "enabled": False,
+                        "error": error,
+                    }, synchronize_session=False)
 
         except Exception as e:
             logging.exception(
@@ -396,16 +504,16 @@ class IndexingService(BaseService):
             )
             with self.db.auto_commit():
                 self.db.session.query(Segment).filter(
-                    Segment.node_id.in_(ids),
+                    Segment.node_id.in_(node_ids),
                 ).update({
                     "status": SegmentStatus.ERROR,
                     "completed_at": None,
                     "stopped_at": datetime.now(),
                     "enabled": False,
                     "error": str(e),
-                })
+                }, synchronize_session=False)
 
-        # 6. Update document status fields
+        # 5. Update document status fields
         self.update(
             document,
             status=DocumentStatus.COMPLETED,
@@ -416,8 +524,5 @@ class IndexingService(BaseService):
     @classmethod
     def _clean_extra_text(cls, text: str) -> str:
         """Remove unwanted whitespace and special characters from the given text."""
-        text = re.sub(r'<\|', '<', text)
-        text = re.sub(r'\|>', '>', text)
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE]', '', text)
-        text = re.sub('\uFFFE', '', text)  # Remove zero-width non-character
-        return text
+        text = SPECIAL_TOKEN_BRACKET_PATTERN.sub(r'\1\2', text)
+        return text.translate(EXTRA_TEXT_TRANSLATION)
@@ -11,6 +11,10 @@ from jieba.analyse import default_tfidf
 
 from internal.entity.jieba_entity import STOPWORD_SET
 
+# Build the dictionary trie at import time, once per process and before Celery forks its workers,
+# instead of lazily inside the first keyword extraction
+jieba.initialize()
+
 
 @inject
 @dataclass
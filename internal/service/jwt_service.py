@@ -5,6 +5,7 @@
 """
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 import jwt
@@ -12,6 +13,16 @@ from injector import inject
 
 from internal.exception import UnauthorizedException
 
+# Signing algorithm used for every issued token
+JWT_ALGORITHM = "HS256"
+JWT_ALGORITHMS = [JWT_ALGORITHM]
+
+
+@lru_cache(maxsize=1)
+def _get_secret_key() -> str:
+    """Read the signing secret once; it is fixed for the lifetime of the process"""
+    return os.getenv("JWT_SECRET_KEY")
+
 
 @inject
 @dataclass
@@ -21,15 +32,13 @@ class JwtService:
     @classmethod
     def generate_token(cls, payload: dict[str, Any]) -> str:
         """Generate a JWT token based on the provided payload"""
-        secret_key = os.getenv("JWT_SECRET_KEY")
-        return jwt.encode(payload, secret_key, algorithm="HS256")
+        return jwt.encode(payload, _get_secret_key(), algorithm=JWT_ALGORITHM)
 
     @classmethod
     def parse_token(cls, token: str) -> dict[str, Any]:
         """Decode the provided JWT token and return the payload"""
-        secret_key = os.getenv("JWT_SECRET_KEY")
         try:
-            return jwt.decode(token, secret_key, algorithms=["HS256"])
+            return jwt.decode(token, _get_secret_key(), algorithms=JWT_ALGORITHMS)
         except jwt.ExpiredSignatureError:
             raise UnauthorizedException("Authorization token has expired. Please log in again.")
         except jwt.InvalidTokenError:
@@ -4,10 +4,13 @@
 @File    : keyword_table_service.py
 """
 from dataclasses import dataclass
+from typing import Optional
 from uuid import UUID
 
 from injector import inject
 from redis import Redis
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 
 from internal.entity.cache_entity import (
     LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE,
@@ -35,8 +38,16 @@ class KeywordTableService(BaseService):
 
         return keyword_table
 
-    def delete_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
-        """Delete redundant entries from the keyword table using the dataset ID and a list of segment IDs"""
+    def delete_keyword_table_from_ids(
+            self,
+            dataset_id: UUID,
+            segment_ids: list[UUID],
+            keywords: Optional[list[str]] = None,
+    ) -> None:
+        """Delete redundant entries from the keyword table using the dataset ID and a list of segment IDs.
+        When the keywords of those segments are known they can be passed in, so only their postings are scanned
+        instead of the whole keyword table.
+        """
         # 1) Remove extra data in the dataset's keyword table. Lock this operation to avoid incorrect data under concurrency.
         cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=dataset_id)
         with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
@@ -45,14 +56,15 @@ class KeywordTableService(BaseService):
             keyword_table = keyword_table_record.keyword_table.copy()
 
             # 3) Convert the segment ID list to a set and create a set of keywords to delete empty keywords later
-            segment_ids_to_delete = set([str(segment_id) for segment_id in segment_ids])
+            segment_ids_to_delete = {str(segment_id) for segment_id in segment_ids}
             keywords_to_delete = set()
 
-            # 4) Iterate over all keywords to check and update
-            for keyword, ids in keyword_table.items():
-                ids_set = set(ids)
-                if segment_ids_to_delete.intersection(ids_set):
-                    keyword_table[keyword] = list(ids_set.difference(segment_ids_to_delete))
+            # 4) Iterate over the candidate keywords, rebuilding only the postings that reference a deleted segment
+            candidate_keywords = keyword_table.keys() if keywords is None else set(keywords) & keyword_table.keys()
+            for keyword in candidate_keywords:
+                ids = keyword_table[keyword]
+                if not segment_ids_to_delete.isdisjoint(ids):
+                    keyword_table[keyword] = [id for id in ids if id not in segment_ids_to_delete]
                     if not keyword_table[keyword]:
                         keywords_to_delete.add(keyword)
 
@@ -70,24 +82,22 @@ class KeywordTableService(BaseService):
         with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
             # 2) Get the specified dataset's keyword table
             keyword_table_record = self.get_keyword_table_from_dataset_id(dataset_id)
-            keyword_table = {
-                field: set(value) for field, value in keyword_table_record.keyword_table.items()
-            }
+            keyword_table = keyword_table_record.keyword_table.copy()
 
-            # 3) Query segments to get their keywords based on segment_ids
+            # 3) Query segments to get their keywords based on segment_ids; the IDs are
+            #    bound as one uuid[] parameter so large batches do not expand into an IN list with one bind per ID
             segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.keywords).filter(
-                Segment.id.in_(segment_ids),
+                Segment.id == any_(literal(list(segment_ids), ARRAY(PG_UUID))),
             ).all()
 
-            # 4) Add new keywords to the keyword table
+            # 4) Add new keywords to the keyword table, converting only the touched postings to sets
+            updated_postings = {}
             for id, keywords in segments:
                 for keyword in keywords:
-                    if keyword not in keyword_table:
-                        keyword_table[keyword] = set()
-                    keyword_table[keyword].add(str(id))
+                    if keyword not in updated_postings:
+                        updated_postings[keyword] = set(keyword_table.get(keyword, []))
+                    updated_postings[keyword].add(str(id))
+            keyword_table.update({field: list(value) for field, value in updated_postings.items()})
 
             # 5) Update the keyword table
-            self.update(
-                keyword_table_record,
-                keyword_table={field: list(value) for field, value in keyword_table.items()}
-            )
+            self.update(keyword_table_record, keyword_table=keyword_table)
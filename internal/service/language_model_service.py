@@ -3,22 +3,35 @@
 """
 @File    : language_model_service.py
 """
+import copy
 import mimetypes
 import os
+import threading
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 
 from flask import current_app
 from injector import inject
 from langchain_openai import ChatOpenAI
 
 from internal.core.language_model import LanguageModelManager
-from internal.core.language_model.entities.model_entity import BaseLanguageModel
+from internal.core.language_model.entities.model_entity import BaseLanguageModel, ModelEntity
+from internal.core.language_model.entities.provider_entity import Provider
 from internal.exception import NotFoundException
 from internal.lib.helper import convert_model_to_dict
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
 
+# The provider registry is loaded once by the singleton LanguageModelManager and never changes at runtime,
+# so the catalog response and the (provider, model) lookups are built on first use and reused afterwards
+_LANGUAGE_MODELS_CACHE: Optional[list[dict[str, Any]]] = None
+_MODEL_ENTITY_CACHE: dict[tuple[str, str], tuple[Provider, ModelEntity]] = {}
+_MODEL_DICT_CACHE: dict[tuple[str, str], dict[str, Any]] = {}
+_CATALOG_LOCK = threading.Lock()
+
+# Provider icons are small static assets, kept in memory as (bytes, mimetype) after the first read
+_ICON_CACHE: dict[str, tuple[bytes, str]] = {}
+
 
 @inject
 @dataclass
@@ -29,76 +42,102 @@ class LanguageModelService(BaseService):
 
     def get_language_models(self) -> list[dict[str, Any]]:
         """Retrieve all model configurations defined in the LLMOps project"""
-        # 1. Retrieve provider list from the language model manager
-        providers = self.language_model_manager.get_providers()
-
-        # 2. Build the language model response list
-        language_models = []
-        for provider in providers:
-            # 3. Retrieve provider metadata and model entities
-            provider_entity = provider.provider_entity
-            model_entities = provider.get_model_entities()
-
-            # 4. Construct response dictionary
-            language_model = {
-                "name": provider_entity.name,
-                "position": provider.position,
-                "label": provider_entity.label,
-                "icon": provider_entity.icon,
-                "description": provider_entity.description,
-                "background": provider_entity.background,
-                "support_model_types": provider_entity.supported_model_types,
-                "models": convert_model_to_dict(model_entities),
-            }
-            language_models.append(language_model)
-
-        return language_models
+        if _LANGUAGE_MODELS_CACHE is None:
+            self._build_language_model_catalog()
+        # Hand out a copy so callers cannot mutate the shared cache
+        return copy.deepcopy(_LANGUAGE_MODELS_CACHE)
+
+    def _build_language_model_catalog(self) -> None:
+        """Serialize every provider and model once; the request paths then only hand out these dict references"""
+        global _LANGUAGE_MODELS_CACHE
+        with _CATALOG_LOCK:
+            # 1. Another thread may have built the catalog while this one waited on the lock
+            if _LANGUAGE_MODELS_CACHE is not None:
+                return
+
+            # 2. Retrieve provider list from the language model manager
+            providers = self.language_model_manager.get_providers()
+
+            # 3. Build the language model response list
+            language_models = []
+            for provider in providers:
+                # 4. Serialize each model entity once, sharing the dict with get_language_model
+                provider_entity = provider.provider_entity
+                model_dicts = []
+                for model_name, model_entity in provider.model_entity_map.items():
+                    model_dict = convert_model_to_dict(model_entity)
+                    _MODEL_DICT_CACHE[(provider.name, model_name)] = model_dict
+                    model_dicts.append(model_dict)
+
+                # 5. Construct response dictionary
+                language_model = {
+                    "name": provider_entity.name,
+                    "position": provider.position,
+                    "label": provider_entity.label,
+                    "icon": provider_entity.icon,
+                    "description": provider_entity.description,
+                    "background": provider_entity.background,
+                    "support_model_types": provider_entity.supported_model_types,
+                    "models": model_dicts,
+                }
+                language_models.append(language_model)
+
+            _LANGUAGE_MODELS_CACHE = language_models
 
     def get_language_model(self, provider_name: str, model_name: str) -> dict[str, Any]:
         """Retrieve detailed model information using provider name + model name"""
-        # 1. Retrieve provider + model entity
+        # 1. Validate the provider first so an unknown provider keeps its own error
         provider = self.language_model_manager.get_provider(provider_name)
-        if not provider:
-            raise NotFoundException("The provider does not exist")
 
-        # 2. Retrieve the model entity
-        model_entity = provider.get_model_entity(model_name)
-        if not model_entity:
-            raise NotFoundException("The model does not exist")
+        # 2. Make sure the serialized catalog exists, then answer with a single dict lookup
+        if _LANGUAGE_MODELS_CACHE is None:
+            self._build_language_model_catalog()
+        model_dict = _MODEL_DICT_CACHE.get((provider_name, model_name))
+
+        # 3. On a miss the provider's own lookup raises the model-not-found error
+        if model_dict is None:
+            provider.get_model_entity(model_name)
 
-        return convert_model_to_dict(model_entity)
+        # 4. Hand out a copy so callers cannot mutate the shared cache
+        return copy.deepcopy(model_dict)
 
     def get_language_model_icon(self, provider_name: str) -> tuple[bytes, str]:
         """Retrieve the icon associated with a provider by name"""
-        # 1. Retrieve provider metadata
+        # 1. Serve the icon from memory when it has already been read
+        icon = _ICON_CACHE.get(provider_name)
+        if icon is not None:
+            return icon
+
+        # 2. Retrieve provider metadata
         provider = self.language_model_manager.get_provider(provider_name)
         if not provider:
             raise NotFoundException("The provider does not exist")
 
-        # 2. Get the root project path
+        # 3. Get the root project path
         root_path = os.path.dirname(os.path.dirname(current_app.root_path))
 
-        # 3. Build the provider folder path
+        # 4. Build the provider folder path
         provider_path = os.path.join(
             root_path,
             "internal", "core", "language_model", "providers", provider_name,
         )
 
-        # 4. Build the icon file path
+        # 5. Build the icon file path
         icon_path = os.path.join(provider_path, "_asset", provider.provider_entity.icon)
 
-        # 5. Ensure the icon exists
+        # 6. Ensure the icon exists
         if not os.path.exists(icon_path):
             raise NotFoundException("No icon found under the provider's _asset folder")
 
-        # 6. Determine MIME type
+        # 7. Determine MIME type
         mimetype, _ = mimetypes.guess_type(icon_path)
         mimetype = mimetype or "application/octet-stream"
 
-        # 7. Read and return icon bytes
+        # 8. Read the icon bytes, then cache and return them
         with open(icon_path, "rb") as f:
             byte_data = f.read()
-            return byte_data, mimetype
+        _ICON_CACHE[provider_name] = (byte_data, mimetype)
+        return byte_data, mimetype
 
     def load_language_model(self, model_config: dict[str, Any]) -> BaseLanguageModel:
         """Load a language model instance based on the given configuration"""
@@ -109,8 +148,7 @@ class LanguageModelService(BaseService):
             parameters = model_config.get("parameters", {})
 
             # 2. Retrieve provider, model entity, and model class from manager
-            provider = self.language_model_manager.get_provider(provider_name)
-            model_entity = provider.get_model_entity(model_name)
+            provider, model_entity = self._get_provider_model(provider_name, model_name)
             model_class = provider.get_model_class(model_entity.model_type)
 
             # 3. Instantiate and return the model
@@ -123,6 +161,17 @@ class LanguageModelService(BaseService):
         except Exception:
             return self.load_default_language_model()
 
+    def _get_provider_model(self, provider_name: str, model_name: str) -> tuple[Provider, ModelEntity]:
+        """Retrieve the provider and model entity for provider name + model name, memoized per pair"""
+        cache_key = (provider_name, model_name)
+        provider_model = _MODEL_ENTITY_CACHE.get(cache_key)
+        if provider_model is None:
+            # Lookups that raise NotFoundException are not cached, so unknown names are re-checked every time
+            provider = self.language_model_manager.get_provider(provider_name)
+            provider_model = (provider, provider.get_model_entity(model_name))
+            _MODEL_ENTITY_CACHE[cache_key] = provider_model
+        return provider_model
+
     @classmethod
     def load_default_language_model(cls) -> BaseLanguageModel:
         """Load a fallback default language model when errors occur or no model is found"""
@@ -6,6 +6,7 @@
 import os
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
 from flask import request
@@ -20,6 +21,22 @@ from .base_service import BaseService
 from .jwt_service import JwtService
 
 
+@lru_cache(maxsize=1)
+def _get_oauth_providers() -> dict[str, OAuth]:
+    """Build the OAuth provider instances once; their credentials are fixed for the lifetime of the process"""
+    # 1. Instantiate supported OAuth providers
+    github = GithubOAuth(
+        client_id=os.getenv("GITHUB_CLIENT_ID"),
+        client_secret=os.getenv("GITHUB_CLIENT_SECRET"),
+        redirect_uri=os.getenv("GITHUB_REDIRECT_URI"),
+    )
+
+    # 2. Construct and return a dictionary of providers
+    return {
+        "github": github,
+    }
+
+
 @inject
 @dataclass
 class OAuthService(BaseService):
@@ -31,17 +48,7 @@ class OAuthService(BaseService):
     @classmethod
     def get_all_oauth(cls) -> dict[str, OAuth]:
         """Retrieve all third-party OAuth integrations supported by LLMOps."""
-        # 1. Instantiate supported OAuth providers
-        github = GithubOAuth(
-            client_id=os.getenv("GITHUB_CLIENT_ID"),
-            client_secret=os.getenv("GITHUB_CLIENT_SECRET"),
-            redirect_uri=os.getenv("GITHUB_REDIRECT_URI"),
-        )
-
-        # 2. Construct and return a dictionary of providers
-        return {
-            "github": github,
-        }
+        return _get_oauth_providers()
 
     @classmethod
     def get_oauth_by_provider_name(cls, provider_name: str) -> OAuth:
@@ -3,10 +3,10 @@
 """
 @File    : openapi_service.py
 """
-import json
 from dataclasses import dataclass
 from typing import Generator
 
+import orjson
 from flask import current_app
 from injector import inject
 from langchain_core.messages import HumanMessage
@@ -22,15 +22,25 @@ from internal.entity.dataset_entity import RetrievalSource
 from internal.exception import NotFoundException, ForbiddenException
 from internal.model import Account, EndUser, Conversation, Message
 from internal.schema.openapi_schema import OpenAPIChatReq
+from internal.task.conversation_task import save_agent_thoughts
 from pkg.response import Response
 from pkg.sqlalchemy import SQLAlchemy
 from .app_config_service import AppConfigService
 from .app_service import AppService
 from .base_service import BaseService
-from .conversation_service import ConversationService
 from .language_model_service import LanguageModelService
 from .retrieval_service import RetrievalService
 
+# Events after which the agent publishes nothing more for the task
+_TERMINAL_EVENTS = frozenset({
+    QueueEvent.AGENT_END, QueueEvent.STOP, QueueEvent.ERROR, QueueEvent.TIMEOUT,
+})
+
+# Agent thought fields sent to the client in every streamed event
+_AGENT_THOUGHT_FIELDS = frozenset({
+    "event", "thought", "observation", "tool", "tool_input", "answer", "latency",
+})
+
 
 @inject
 @dataclass
@@ -40,7 +50,6 @@ class OpenAPIService(BaseService):
     app_service: AppService
     retrieval_service: RetrievalService
     app_config_service: AppConfigService
-    conversation_service: ConversationService
     language_model_service: LanguageModelService
 
     def chat(self, req: OpenAPIChatReq, account: Account):
@@ -159,67 +168,92 @@ class OpenAPIService(BaseService):
         # 16. Execute different logic depending on whether streaming is enabled
         if req.stream.data is True:
             agent_thoughts_dict = {}
+            # Chunks of each AGENT_MESSAGE event, joined once before persisting instead of re-copied per chunk
+            message_chunks = {}
 
-            def handle_stream() -> Generator:
-                """Streaming event handler.
-                In Python, any function that contains 'yield' returns a generator.
-                """
-                for agent_thought in agent.stream(agent_state):
-                    # Extract thought and answer
-                    event_id = str(agent_thought.id)
-
-                    # Populate agent_thought for persistence
-                    if agent_thought.event != QueueEvent.PING:
-                        # Only AGENT_MESSAGE is accumulated; everything else is overwritten
-                        if agent_thought.event == QueueEvent.AGENT_MESSAGE:
-                            if event_id not in agent_thoughts_dict:
-                                # Initialize agent message event
-                                agent_thoughts_dict[event_id] = agent_thought
-                            else:
-                                # Accumulate partial agent messages
-                                agent_thoughts_dict[event_id] = agent_thoughts_dict[event_id].model_copy(update={
-                                    "thought": agent_thoughts_dict[event_id].thought + agent_thought.thought,
-                                    "answer": agent_thoughts_dict[event_id].answer + agent_thought.answer,
-                                    "latency": agent_thought.latency,
-                                })
-                        else:
-                            # Handle other event types
-                            agent_thoughts_dict[event_id] = agent_thought
-                    data = {
-                        **agent_thought.model_dump(include={
-                            "event", "thought", "observation", "tool", "tool_input", "answer", "latency",
-                        }),
-                        "id": event_id,
-                        "end_user_id": str(end_user.id),
-                        "conversation_id": str(conversation.id),
-                        "message_id": str(message.id),
-                        "task_id": str(agent_thought.task_id),
-                    }
-                    yield f"event: {agent_thought.event}\ndata:{json.dumps(data)}\n\n"
-
-                # 22. Persist the message and reasoning traces
-                self.conversation_service.save_agent_thoughts(
+            def persist_agent_thoughts() -> None:
+                """Join the accumulated message chunks and queue the reasoning traces for persistence"""
+                # 1. Join the accumulated chunks into the final agent message events
+                for event_id, chunks in message_chunks.items():
+                    agent_thoughts_dict[event_id] = agent_thoughts_dict[event_id].model_copy(update={
+                        "thought": "".join(chunks["thought"]),
+                        "answer": "".join(chunks["answer"]),
+                        "latency": chunks["latency"],
+                    })
+
+                # 2. Persist the message and reasoning traces
+                save_agent_thoughts.delay(
                     account_id=account.id,
                     app_id=app.id,
                     app_config=app_config,
                     conversation_id=conversation.id,
                     message_id=message.id,
-                    agent_thoughts=[agent_thought for agent_thought in agent_thoughts_dict.values()],
+                    agent_thoughts=[agent_thought.model_dump(mode="json") for agent_thought in agent_thoughts_dict.values()],
                 )
 
+            def handle_stream() -> Generator:
+                """Streaming event handler.
+                In Python, any function that contains 'yield' returns a generator.
+                """
+                # IDs shared by every event of this chat are stringified once
+                end_user_id, conversation_id, message_id = str(end_user.id), str(conversation.id), str(message.id)
+                persisted = False
+
+                try:
+                    for agent_thought in agent.stream(agent_state):
+                        # Extract thought and answer
+                        event_id = str(agent_thought.id)
+
+                        # Populate agent_thought for persistence
+                        if agent_thought.event != QueueEvent.PING:
+                            # Only AGENT_MESSAGE is accumulated; everything else is overwritten
+                            if agent_thought.event == QueueEvent.AGENT_MESSAGE:
+                                if event_id not in agent_thoughts_dict:
+                                    # Initialize agent message event
+                                    agent_thoughts_dict[event_id] = agent_thought
+                                    message_chunks[event_id] = {"thought": [], "answer": [], "latency": 0}
+                                # Accumulate partial agent messages
+                                chunks = message_chunks[event_id]
+                                chunks["thought"].append(agent_thought.thought)
+                                chunks["answer"].append(agent_thought.answer)
+                                chunks["latency"] = agent_thought.latency
+                            else:
+                                # Handle other event types
+                                agent_thoughts_dict[event_id] = agent_thought
+
+                        # The terminal event is the last one on the queue, so persistence is queued
+                        # before its frame is sent instead of after the client has received it
+                        if agent_thought.event in _TERMINAL_EVENTS and not persisted:
+                            persist_agent_thoughts()
+                            persisted = True
+
+                        data = {
+                            **agent_thought.model_dump(include=_AGENT_THOUGHT_FIELDS),
+                            "id": event_id,
+                            "end_user_id": end_user_id,
+                            "conversation_id": conversation_id,
+                            "message_id": message_id,
+                            "task_id": str(agent_thought.task_id),
+                        }
+                        yield f"event: {agent_thought.event}\ndata:{orjson.dumps(data, default=str).decode()}\n\n"
+                finally:
+                    # A client disconnect closes the generator early; still persist whatever was received
+                    if not persisted:
+                        persist_agent_thoughts()
+
             return handle_stream()
 
         # 17. Non-streaming output
         agent_result = agent.invoke(agent_state)
 
         # 18. Persist the message and reasoning traces
-        self.conversation_service.save_agent_thoughts(
+        save_agent_thoughts.delay(
             account_id=account.id,
             app_id=app.id,
             app_config=app_config,
             conversation_id=conversation.id,
             message_id=message.id,
-            agent_thoughts=agent_result.agent_thoughts,
+            agent_thoughts=[agent_thought.model_dump(mode="json") for agent_thought in agent_result.agent_thoughts],
         )
 
         return Response(data={
@@ -12,6 +12,12 @@ from langchain_text_splitters import TextSplitter, RecursiveCharacterTextSplitte
 
 from internal.model import ProcessRule
 
+# Precompiled patterns for the preprocessing rules, shared by every cleaning call
+EXTRA_NEWLINE_PATTERN = re.compile(r'\n{3,}')
+EXTRA_SPACE_PATTERN = re.compile(r'[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}')
+EMAIL_PATTERN = re.compile(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)')
+URL_PATTERN = re.compile(r'https?://[^\s]+')
+
 
 @inject
 @dataclass
@@ -42,15 +48,11 @@ class ProcessRuleService:
         for pre_process_rule in process_rule.rule["pre_process_rules"]:
             # 2) Remove extra whitespace
             if pre_process_rule["id"] == "remove_extra_space" and pre_process_rule["enabled"] is True:
-                pattern = r'\n{3,}'
-                text = re.sub(pattern, '\n\n', text)
-                pattern = r'[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}'
-                text = re.sub(pattern, ' ', text)
+                text = EXTRA_NEWLINE_PATTERN.sub('\n\n', text)
+                text = EXTRA_SPACE_PATTERN.sub(' ', text)
             # 3) Remove URLs and email addresses
             if pre_process_rule["id"] == "remove_url_and_email" and pre_process_rule["enabled"] is True:
-                pattern = r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)'
-                text = re.sub(pattern, '', text)
-                pattern = r'https?://[^\s]+'
-                text = re.sub(pattern, '', text)
+                text = EMAIL_PATTERN.sub('', text)
+                text = URL_PATTERN.sub('', text)
 
         return text
@@ -187,6 +187,7 @@ class SegmentService(BaseService):
         # 4. Compute hash to decide whether vector/document stats need updating
         new_hash = generate_text_hash(req.content.data)
         required_update = segment.hash != new_hash
+        origin_keywords = segment.keywords
 
         try:
             # 5. Update segment record
@@ -200,7 +201,7 @@ class SegmentService(BaseService):
             )
 
             # 7. Refresh keyword table memberships for this segment
-            self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
+            self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id], origin_keywords)
             self.keyword_table_service.add_keyword_table_from_ids(dataset_id, [segment_id])
 
             # 8. If content changed, update document stats + vector DB record
@@ -330,7 +331,11 @@ class SegmentService(BaseService):
                 if enabled is True and document.enabled is True:
                     self.keyword_table_service.add_keyword_table_from_ids(dataset_id, [segment_id])
                 else:
-                    self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
+                    self.keyword_table_service.delete_keyword_table_from_ids(
+                        dataset_id,
+                        [segment_id],
+                        segment.keywords,
+                    )
 
                 # 8. Sync enabled state to vector DB
                 self.vector_database_service.collection.data.update(
@@ -383,7 +388,7 @@ class SegmentService(BaseService):
         self.delete(segment)
 
         # 4. Remove keywords for this segment from keyword table
-        self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
+        self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id], segment.keywords)
 
         # 5. Delete vector DB record
         try:
@@ -24,10 +24,10 @@ from internal.entity.dataset_entity import RetrievalSource
 from internal.exception import NotFoundException, ForbiddenException
 from internal.model import App, Account, Conversation, Message
 from internal.schema.web_app_schema import WebAppChatReq
+from internal.task.conversation_task import save_agent_thoughts
 from pkg.sqlalchemy import SQLAlchemy
 from .app_config_service import AppConfigService
 from .base_service import BaseService
-from .conversation_service import ConversationService
 from .language_model_service import LanguageModelService
 from .retrieval_service import RetrievalService
 
@@ -39,7 +39,6 @@ class WebAppService(BaseService):
     db: SQLAlchemy
     app_config_service: AppConfigService
     retrieval_service: RetrievalService
-    conversation_service: ConversationService
     language_model_service: LanguageModelService
 
     def get_web_app(self, token: str) -> App:
@@ -195,13 +194,13 @@ class WebAppService(BaseService):
             yield f"event: {agent_thought.event}\ndata:{json.dumps(data)}\n\n"
 
         # 20. Persist the message and reasoning traces
-        self.conversation_service.save_agent_thoughts(
+        save_agent_thoughts.delay(
             account_id=account.id,
             app_id=app.id,
             app_config=app_config,
             conversation_id=conversation.id,
             message_id=message.id,
-            agent_thoughts=[agent_thought for agent_thought in agent_thoughts.values()],
+            agent_thoughts=[agent_thought.model_dump(mode="json") for agent_thought in agent_thoughts.values()],
         )
 
     def stop_web_app_chat(self, token: str, task_id: UUID, account: Account):
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : conversation_task.py
+"""
+from typing import Any
+from uuid import UUID
+
+from celery import shared_task
+
+
+@shared_task(acks_late=True)
+def save_agent_thoughts(
+        account_id: UUID,
+        app_id: UUID,
+        app_config: dict[str, Any],
+        conversation_id: UUID,
+        message_id: UUID,
+        agent_thoughts: list[dict[str, Any]],
+) -> None:
+    """Persist the agent reasoning steps of a finished chat in the background."""
+    from app.http.module import injector
+    from internal.core.agent.entities.queue_entity import AgentThought
+    from internal.service.conversation_service import ConversationService
+
+    conversation_service = injector.get(ConversationService)
+    conversation_service.save_agent_thoughts(
+        account_id=account_id,
+        app_id=app_id,
+        app_config=app_config,
+        conversation_id=conversation_id,
+        message_id=message_id,
+        agent_thoughts=[AgentThought.model_validate(agent_thought) for agent_thought in agent_thoughts],
+    )
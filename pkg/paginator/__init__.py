@@ -1,3 +1,3 @@
-from .paginator import PaginatorReq, Paginator, PageModel
+from .paginator import PaginatorReq, CursorPaginatorReq, Paginator, PageModel
 
-__all__ = ['PaginatorReq', 'Paginator', 'PageModel']
+__all__ = ['PaginatorReq', 'CursorPaginatorReq', 'Paginator', 'PageModel']
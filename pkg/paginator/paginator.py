@@ -6,12 +6,15 @@
 """
 
 import math
+import uuid
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
 from flask_wtf import FlaskForm
-from wtforms import IntegerField
-from wtforms.validators import Optional, NumberRange
+from sqlalchemy import func, select as sa_select, tuple_
+from wtforms import IntegerField, StringField
+from wtforms.validators import Optional, NumberRange, ValidationError
 
 from pkg.sqlalchemy import SQLAlchemy
 
@@ -40,6 +43,39 @@ class PaginatorReq(FlaskForm):
     )
 
 
+class CursorPaginatorReq(PaginatorReq):
+    """
+    Pagination request that additionally accepts a keyset cursor.
+    The cursor is the `next_cursor` returned with the previous page, formatted as `<created_at timestamp>_<id>`.
+    When present, the page is located by seeking past the cursor instead of using OFFSET.
+    """
+    cursor = StringField("cursor", default="", validators=[Optional()])
+
+    def validate_cursor(self, field: StringField) -> None:
+        """Validate that the cursor can be decoded"""
+        if field.data:
+            try:
+                decode_cursor(field.data)
+            except ValueError:
+                raise ValidationError("Invalid pagination cursor")
+
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    """Encode the sort key of the last row of a page into a cursor string"""
+    return f"{int(created_at.timestamp())}_{id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a cursor string into its (created_at, id) sort key, raising ValueError if malformed"""
+    timestamp, _, id = cursor.partition("_")
+    try:
+        created_at = datetime.fromtimestamp(int(timestamp))
+    except (OverflowError, OSError) as e:
+        # Out-of-range timestamps are malformed input too, not a server error
+        raise ValueError(f"Cursor timestamp out of range: {timestamp}") from e
+    return created_at, uuid.UUID(id)
+
+
 @dataclass
 class Paginator:
     """
@@ -49,25 +85,51 @@ class Paginator:
     total_record: int = 0  # Total number of records
     current_page: int = 1  # Current page number
     page_size: int = 20  # Number of records per page
+    next_cursor: str = ""  # Keyset cursor for the next page, empty when there are no more records
 
     def __init__(self, db: SQLAlchemy, req: PaginatorReq = None):
+        self.cursor = ""
         if req is not None:
             self.current_page = req.current_page.data
             self.page_size = req.page_size.data
+            if isinstance(req, CursorPaginatorReq):
+                self.cursor = req.cursor.data or ""
         self.db = db
 
-    def paginate(self, select) -> list[Any]:
+    def paginate(self, select, cursor_columns: tuple = None) -> list[Any]:
         """
         Apply pagination to the given SQLAlchemy query.
+        If `cursor_columns` is given as (created_at column, id column), the query must be ordered by them
+        descending; a request cursor then seeks past it (keyset pagination) instead of using OFFSET.
         """
-        # 1. Call db.paginate to paginate the results
-        p = self.db.paginate(select, page=self.current_page, per_page=self.page_size, error_out=False)
+        # 1. With a cursor, seek past it instead of using OFFSET; the totals still cover the whole unfiltered query
+        if cursor_columns is not None and self.cursor:
+            p = self.db.paginate(
+                select.filter(tuple_(*cursor_columns) < decode_cursor(self.cursor)),
+                page=1,
+                per_page=self.page_size,
+                error_out=False,
+                count=False,
+            )
+            total = self.db.session.execute(
+                sa_select(func.count()).select_from(select.order_by(None).subquery()),
+            ).scalar()
+        else:
+            # 2. Otherwise call db.paginate to paginate the results
+            p = self.db.paginate(select, page=self.current_page, per_page=self.page_size, error_out=False)
+            total = p.total
+
+        # 3. Compute total records and total pages
+        self.total_record = total
+        self.total_page = math.ceil(total / self.page_size)
 
-        # 2. Compute total records and total pages
-        self.total_record = p.total
-        self.total_page = math.ceil(p.total / self.page_size)
+        # 4. Record the cursor of the next page when this page is full
+        if cursor_columns is not None and len(p.items) == self.page_size:
+            created_at_column, id_column = cursor_columns
+            last_item = p.items[-1]
+            self.next_cursor = encode_cursor(getattr(last_item, created_at_column.key), getattr(last_item, id_column.key))
 
-        # 3. Return the paginated items
+        # 5. Return the paginated items
         return p.items
 
 
@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import column, desc, select, table
+from sqlalchemy.dialects import postgresql
+
+from pkg.paginator.paginator import Paginator, encode_cursor, decode_cursor
+
+records = table("record", column("created_at"), column("id"))
+
+
+# --------------------------
+# Keyset cursor encoding
+# --------------------------
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 1, 12, 30, 45)
+    record_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, record_id)
+
+    assert decode_cursor(cursor) == (created_at, record_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        pytest.param("", id="invalid: empty"),
+        pytest.param("1767225600", id="invalid: missing id"),
+        pytest.param("1767225600_not-a-uuid", id="invalid: malformed id"),
+        pytest.param("yesterday_" + str(uuid.UUID(int=0)), id="invalid: non-numeric timestamp"),
+        pytest.param("99999999999999999999_" + str(uuid.UUID(int=0)), id="invalid: out-of-range timestamp"),
+    ],
+)
+def test_decode_cursor_rejects_malformed_values(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+# --------------------------
+# Keyset pagination
+# --------------------------
+class FakeDB:
+    """Stand-in for the SQLAlchemy extension that records the paginated query and returns fixed rows"""
+
+    def __init__(self, items, total):
+        self.items = items
+        self.total = total
+        self.paginated_select = None
+        self.session = SimpleNamespace(execute=lambda stmt: SimpleNamespace(scalar=lambda: total))
+
+    def paginate(self, select, page, per_page, error_out, count=True):
+        self.paginated_select = select
+        return SimpleNamespace(items=self.items[:per_page], total=self.total if count else None)
+
+
+def make_records(count):
+    start = datetime(2026, 1, 1)
+    return [
+        SimpleNamespace(created_at=start - timedelta(minutes=index), id=uuid.uuid4())
+        for index in range(count)
+    ]
+
+
+def paginate_with_cursor(items, total, page_size, cursor):
+    db = FakeDB(items, total)
+    paginator = Paginator(db)
+    paginator.page_size = page_size
+    paginator.cursor = cursor
+    query = select(records).order_by(desc(records.c.created_at), desc(records.c.id))
+    result = paginator.paginate(query, cursor_columns=(records.c.created_at, records.c.id))
+    return db, paginator, result
+
+
+def test_paginate_with_cursor_seeks_past_cursor():
+    cursor = encode_cursor(datetime(2026, 1, 1), uuid.UUID(int=1))
+
+    db, _, _ = paginate_with_cursor(make_records(2), total=5, page_size=2, cursor=cursor)
+
+    sql = str(db.paginated_select.compile(dialect=postgresql.dialect()))
+    assert "(record.created_at, record.id) < (" in sql
+
+
+def test_paginate_with_cursor_keeps_totals():
+    cursor = encode_cursor(datetime(2026, 1, 1), uuid.UUID(int=1))
+
+    _, paginator, _ = paginate_with_cursor(make_records(2), total=5, page_size=2, cursor=cursor)
+
+    assert paginator.total_record == 5
+    assert paginator.total_page == 3
+
+
+def test_paginate_with_cursor_returns_next_cursor_on_full_page():
+    items = make_records(2)
+
+    _, paginator, result = paginate_with_cursor(items, total=5, page_size=2, cursor="")
+
+    assert result == items
+    assert paginator.next_cursor == encode_cursor(items[-1].created_at, items[-1].id)
+
+
+def test_paginate_with_cursor_omits_next_cursor_on_last_page():
+    cursor = encode_cursor(datetime(2026, 1, 1), uuid.UUID(int=1))
+
+    _, paginator, result = paginate_with_cursor(make_records(1), total=5, page_size=2, cursor=cursor)
+
+    assert len(result) == 1
+    assert paginator.next_cursor == ""